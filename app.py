@@ -5,17 +5,22 @@ A reinforcement-learning based autonomous AI agent for India's renewable energy
 
 import streamlit as st
 import numpy as np
-import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import time
-from datetime import datetime, timedelta
-import json
+from pathlib import Path
 
 # Import our custom modules from core package
-from core.grid_simulator import MicrogridDigitalTwin, GridState
+from core.grid_simulator import (
+    MicrogridDigitalTwin, FREQUENCY_VIOLATIONS, TOTAL_VIOLATIONS
+)
+from core.history import GridHistory, renewable_share
+from core.stats_kernels import fused_behaviour_summary
 from core.rl_agent import RLAgent, LegacyGridController
-from core.forecaster import ShortTermForecaster
+from core.forecaster import ShortTermForecaster, LSTMForecaster
+from core.sim_worker import SimulationWorker
+from core.training import train_agent
+from core._warmup import warm_up
+
+ASSETS_DIR = Path(__file__).parent / 'assets'
+AGENT_PATH = Path(__file__).parent / 'trained_agent.pt'  # Quick-trained weights
 
 # Page configuration
 st.set_page_config(
@@ -25,348 +30,168 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_data
+def _load_asset(name):
+    """Read a static stylesheet or HTML fragment from assets/ once per server"""
+    return (ASSETS_DIR / name).read_text(encoding='utf-8')
+
 # Custom CSS for professional glassmorphism UI
-st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;600;700;800&display=swap');
-    
-    * {
-        font-family: 'Inter', sans-serif;
-    }
-    
-    /* Pastel gradient background */
-    .main {
-        background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
-    }
-    
-    /* Glassmorphism sidebar */
-    [data-testid="stSidebar"] {
-        background: rgba(163, 201, 168, 0.7);
-        backdrop-filter: blur(10px);
-        border-right: 1px solid rgba(255, 255, 255, 0.3);
-    }
-    
-    /* Headers with gradient */
-    h1, h2, h3, h4, h5, h6 {
-        color: #2C5F2D !important;
-        font-weight: 700;
-    }
-    
-    h1 {
-        background: linear-gradient(135deg, #2C5F2D 0%, #4A8B4D 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-    }
-    
-    /* Glassmorphism cards */
-    .glass-card {
-        background: rgba(255, 255, 255, 0.6);
-        backdrop-filter: blur(15px);
-        border-radius: 20px;
-        padding: 2rem;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.1);
-        border: 1px solid rgba(255, 255, 255, 0.4);
-        transition: all 0.3s ease;
-        animation: fadeIn 0.6s ease-out;
-    }
-    
-    .glass-card:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 12px 40px rgba(0, 0, 0, 0.15);
-    }
-    
-    @keyframes fadeIn {
-        from {
-            opacity: 0;
-            transform: translateY(20px);
-        }
-        to {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
-    
-    /* Hero section with glassmorphism */
-    .hero-section {
-        background: linear-gradient(135deg, rgba(163, 201, 168, 0.8), rgba(132, 169, 140, 0.8));
-        backdrop-filter: blur(20px);
-        border-radius: 25px;
-        padding: 3rem;
-        text-align: center;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.1);
-        border: 1px solid rgba(255, 255, 255, 0.3);
-        margin-bottom: 2rem;
-        animation: heroFadeIn 1s ease-out;
-    }
-    
-    @keyframes heroFadeIn {
-        from {
-            opacity: 0;
-            transform: scale(0.95);
-        }
-        to {
-            opacity: 1;
-            transform: scale(1);
-        }
-    }
-    
-    .hero-logo {
-        font-size: 4rem;
-        animation: bounce 2s infinite;
-    }
-    
-    @keyframes bounce {
-        0%, 100% { transform: translateY(0); }
-        50% { transform: translateY(-10px); }
-    }
-    
-    .hero-title {
-        color: white !important;
-        font-size: 3.5rem;
-        font-weight: 900;
-        margin: 1rem 0;
-        text-shadow: 2px 2px 4px rgba(0, 0, 0, 0.2);
-    }
-    
-    .hero-subtitle {
-        color: white;
-        font-size: 1.5rem;
-        font-weight: 400;
-        opacity: 0.95;
-    }
-    
-    /* Pastel buttons */
-    .stButton>button {
-        background: linear-gradient(135deg, #A3C9A8 0%, #B8D4BE 100%);
-        color: white;
-        border-radius: 15px;
-        height: 3.5em;
-        width: 100%;
-        font-size: 1.1em;
-        font-weight: 700;
-        border: none;
-        box-shadow: 0 4px 15px rgba(163, 201, 168, 0.4);
-        transition: all 0.3s ease;
-        text-transform: uppercase;
-        letter-spacing: 1px;
-    }
-    
-    .stButton>button:hover {
-        background: linear-gradient(135deg, #9EB5A5 0%, #B0C8B7 100%);
-        transform: translateY(-3px);
-        box-shadow: 0 6px 20px rgba(163, 201, 168, 0.5);
-    }
-    
-    .stButton>button:active {
-        transform: translateY(0px);
-    }
-    
-    /* Metric cards with glassmorphism */
-    .metric-glass-card {
-        background: linear-gradient(135deg, rgba(163, 201, 168, 0.7), rgba(184, 212, 190, 0.7));
-        backdrop-filter: blur(15px);
-        padding: 1.8rem;
-        border-radius: 20px;
-        color: white;
-        text-align: center;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.1);
-        border: 1px solid rgba(255, 255, 255, 0.3);
-        transition: all 0.3s ease;
-        animation: fadeInUp 0.6s ease-out;
-    }
-    
-    @keyframes fadeInUp {
-        from {
-            opacity: 0;
-            transform: translateY(30px);
-        }
-        to {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
-    
-    .metric-glass-card:hover {
-        transform: translateY(-8px) scale(1.03);
-        box-shadow: 0 12px 40px rgba(163, 201, 168, 0.4);
-    }
-    
-    .metric-value {
-        font-size: 3rem;
-        font-weight: 900;
-        margin: 0.5rem 0;
-        text-shadow: 2px 2px 4px rgba(0, 0, 0, 0.1);
-    }
-    
-    .metric-label {
-        font-size: 1rem;
-        font-weight: 600;
-        text-transform: uppercase;
-        letter-spacing: 2px;
-        opacity: 0.95;
-    }
-    
-    /* Alert boxes */
-    .glass-alert-success {
-        background: rgba(163, 201, 168, 0.6);
-        backdrop-filter: blur(10px);
-        border-radius: 15px;
-        padding: 1.5rem;
-        border-left: 5px solid #4A8B4D;
-        box-shadow: 0 4px 20px rgba(163, 201, 168, 0.3);
-        color: #2C5F2D;
-        margin-bottom: 1rem;
-    }
-    
-    .glass-alert-warning {
-        background: rgba(249, 199, 79, 0.6);
-        backdrop-filter: blur(10px);
-        border-radius: 15px;
-        padding: 1.5rem;
-        border-left: 5px solid #F9C74F;
-        box-shadow: 0 4px 20px rgba(249, 199, 79, 0.3);
-        color: #856404;
-        margin-bottom: 1rem;
-    }
-    
-    .glass-alert-info {
-        background: rgba(144, 190, 224, 0.6);
-        backdrop-filter: blur(10px);
-        border-radius: 15px;
-        padding: 1.5rem;
-        border-left: 5px solid #90BEE0;
-        box-shadow: 0 4px 20px rgba(144, 190, 224, 0.3);
-        color: #004085;
-        margin-bottom: 1rem;
-    }
-    
-    /* Tech badges */
-    .tech-badge {
-        display: inline-block;
-        background: rgba(255, 255, 255, 0.8);
-        backdrop-filter: blur(5px);
-        padding: 0.5rem 1rem;
-        border-radius: 15px;
-        margin: 0.3rem;
-        font-size: 0.85rem;
-        font-weight: 600;
-        color: #2C5F2D;
-        box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
-        transition: all 0.2s ease;
-    }
-    
-    .tech-badge:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.15);
-    }
-    
-    /* Performance banner */
-    .performance-banner {
-        background: linear-gradient(135deg, rgba(163, 201, 168, 0.9), rgba(132, 169, 140, 0.9));
-        backdrop-filter: blur(20px);
-        padding: 2rem;
-        border-radius: 20px;
-        margin: 2rem 0;
-        text-align: center;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.15);
-        border: 1px solid rgba(255, 255, 255, 0.3);
-        animation: pulse 2s infinite;
-    }
-    
-    @keyframes pulse {
-        0%, 100% { transform: scale(1); }
-        50% { transform: scale(1.02); }
-    }
-    
-    /* Streamlit metric override */
-    [data-testid="stMetricValue"] {
-        font-size: 2.5rem;
-        font-weight: 900;
-        color: #2C5F2D;
-    }
-    
-    /* Footer */
-    .footer {
-        background: rgba(255, 255, 255, 0.6);
-        backdrop-filter: blur(15px);
-        border-radius: 25px;
-        padding: 3rem;
-        text-align: center;
-        margin-top: 4rem;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.1);
-        border: 1px solid rgba(255, 255, 255, 0.4);
-    }
-    
-    /* Tabs styling */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 10px;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        background: rgba(255, 255, 255, 0.6);
-        backdrop-filter: blur(10px);
-        border-radius: 15px;
-        padding: 1rem 2rem;
-        border: 1px solid rgba(255, 255, 255, 0.3);
-        transition: all 0.3s ease;
-    }
-    
-    .stTabs [data-baseweb="tab"]:hover {
-        background: rgba(163, 201, 168, 0.7);
-        transform: translateY(-2px);
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background: linear-gradient(135deg, #A3C9A8 0%, #B8D4BE 100%);
-        color: white;
-    }
-    </style>
-""", unsafe_allow_html=True)
+st.markdown(f"<style>{_load_asset('styles.css')}</style>", unsafe_allow_html=True)
 
 # ============================================================================
 # Helper Functions
 # ============================================================================
 
+@st.cache_resource(show_spinner=False)
+def warm_up_kernels():
+    """Compile the Numba kernels once per server process, before first use"""
+    warm_up()
+
+@st.cache_resource
+def get_forecast_model():
+    """
+    LSTM forecaster weights shared by every session
+    
+    The dashboard only runs inference with it, so one module can serve all
+    sessions' forecasters; each keeps its own observation history.
+    """
+    model = LSTMForecaster(ShortTermForecaster.INPUT_DIM)
+    model.eval()
+    return model
+
+@st.cache_resource(show_spinner=False)
+def get_trained_agent(state_dim, action_dim, episodes=50, steps=100, seed=0,
+                      _progress_callback=None):
+    """
+    Quick-trained PPO agent, cached per hyperparameter set
+    
+    Training runs once per (state_dim, action_dim, episodes, steps, seed);
+    later requests reuse the result. Sessions only call select_action on
+    the shared agent, which does not modify it.
+    
+    No UI elements are created here: Streamlit would replay them on every
+    cache hit. The caller owns the progress bar and passes its update
+    method as _progress_callback (unhashed, so not part of the cache key).
+    """
+    agent = train_agent(
+        state_dim=state_dim,
+        action_dim=action_dim,
+        episodes=episodes,
+        steps=steps,
+        seed=seed,
+        forecast_model=get_forecast_model(),
+        progress_callback=_progress_callback
+    )
+    agent.save(AGENT_PATH)
+    return agent
+
+@st.cache_resource(show_spinner=False)
+def load_saved_agent(state_dim, action_dim):
+    """
+    Agent from a previous quick training run, or None
+    
+    Lets a restarted server skip retraining. Checkpoints with different
+    network dimensions are ignored.
+    """
+    if not AGENT_PATH.exists():
+        return None
+    try:
+        agent = RLAgent.load(str(AGENT_PATH))
+    except Exception:
+        return None
+    if (agent.state_dim, agent.action_dim) != (state_dim, action_dim):
+        return None
+    return agent
+
+def downsample_minmax(times, values, n_out=1000):
+    """
+    Reduce a series to roughly n_out points for plotting
+    
+    Splits the series into equal buckets and keeps each bucket's minimum
+    and maximum, so spikes and dips survive while the browser only has to
+    draw a bounded number of points. Returns x/y keyword arguments for a
+    Plotly trace.
+    """
+    n = len(values)
+    if n <= n_out:
+        return dict(x=times, y=values)
+    
+    size = -(-n // (n_out // 2))  # ceil division -> bucket length
+    n_full = n // size * size
+    blocks = values[:n_full].reshape(-1, size)
+    offsets = np.arange(0, n_full, size)
+    
+    keep = np.unique(np.concatenate((
+        offsets + blocks.argmin(axis=1),
+        offsets + blocks.argmax(axis=1),
+        np.arange(n_full, n)  # partial tail bucket
+    )))
+    return dict(x=times[keep], y=values[keep])
+
 def display_metrics(simulator, history, mode):
-    """Display current metrics in cards"""
+    """Display key metrics for a simulator"""
     state = simulator.state
     
+    st.metric("Stability", f"{state.stability_score:.1%}")
+    st.metric("Battery", f"{state.battery_soc:.1%}")
+    st.metric("Cost", f"₹{state.energy_cost:.2f}")
+    
+    if len(history) > 10:
+        st.metric("Avg Stability", f"{history.window_mean('stability'):.1%}")
+        st.metric("Avg Cost", f"₹{history.window_mean('cost'):.2f}")
+        st.metric("Outages", f"{history.outages}")
+
+def display_key_metrics(simulator, history):
+    """Display the headline metric cards for the active mode's history"""
     col1, col2, col3, col4 = st.columns(4)
     
+    state = simulator.state
+    
     with col1:
-        st.metric("Grid Stability", f"{state.stability_score * 100:.1f}%",
-                 delta=f"{(state.stability_score - 0.9) * 100:.1f}%")
+        st.metric(
+            "Grid Stability",
+            f"{state.stability_score:.1%}",
+            f"{state.stability_score - 0.95:.1%}" if len(history) > 0 else None
+        )
     
     with col2:
-        st.metric("Battery SOC", f"{state.battery_soc * 100:.1f}%",
-                 delta=f"{(state.battery_soc - 0.5) * 100:.1f}%")
+        st.metric(
+            "Battery SOC",
+            f"{state.battery_soc:.1%}",
+            f"{state.battery_charge_rate:.2f} kW/s"
+        )
     
     with col3:
-        renewable_pct = (state.solar_generation + state.wind_generation) / max(state.load_demand, 1) * 100
-        st.metric("Renewable Use", f"{renewable_pct:.1f}%")
+        # Logged once per step; fall back to the live state before the first step
+        if len(history) > 0:
+            renewable_pct = float(history.latest('renewable_pct'))
+        else:
+            renewable_pct = renewable_share(state.solar_generation, state.wind_generation, state.load_demand)
+        st.metric(
+            "Renewable %",
+            f"{renewable_pct:.1f}%",
+            f"{renewable_pct - 75:.1f}%"
+        )
     
     with col4:
-        outages = sum([1 for s in history[mode]['states'] if s.stability_score < 0.7]) if history[mode]['states'] else 0
-        st.metric("Outages", f"{outages}")
+        cost = state.energy_cost
+        st.metric(
+            "Energy Cost",
+            f"₹{cost:.2f}",
+            f"₹{-abs(cost - 100):.2f}" if cost < 100 else f"₹{cost - 100:.2f}"
+        )
 
-def display_realtime_graphs(simulator, history, ai_enabled):
-    """Display real-time monitoring graphs"""
-    mode = 'ai' if ai_enabled else 'rule'
-    
-    if len(history[mode]['time']) < 2:
-        st.info("⏳ Waiting for simulation data...")
-        return
-    
-    times = history[mode]['time']
-    states = history[mode]['states']
-    
-    # Extract time series data
-    solar = [s.solar_generation for s in states]
-    wind = [s.wind_generation for s in states]
-    load = [s.load_demand for s in states]
-    battery_soc = [s.battery_soc * 100 for s in states]
-    stability = [s.stability_score * 100 for s in states]
-    grid_import = [s.grid_import for s in states]
+def _build_monitor_skeleton():
+    """
+    Build the realtime monitoring figure with empty traces
+    
+    Subplots, axis titles, threshold lines and styling are fixed, so this
+    runs once per session and reruns only replace the trace data. The
+    eight traces are in the order display_realtime_graphs fills them.
+    """
+    # Plotly is only needed once a chart is drawn; keep it off the cold start
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
     
     # Create subplots
     fig = make_subplots(
@@ -378,87 +203,133 @@ def display_realtime_graphs(simulator, history, ai_enabled):
         horizontal_spacing=0.1
     )
     
-    # Generation & Demand
-    fig.add_trace(go.Scatter(x=times, y=solar, name='Solar', line=dict(color='#ffa500')), row=1, col=1)
-    fig.add_trace(go.Scatter(x=times, y=wind, name='Wind', line=dict(color='#4682b4')), row=1, col=1)
-    fig.add_trace(go.Scatter(x=times, y=load, name='Load', line=dict(color='#dc143c', dash='dash')), row=1, col=1)
-    
-    # Battery SOC
-    fig.add_trace(go.Scatter(x=times, y=battery_soc, name='Battery SOC', 
-                            fill='tozeroy', line=dict(color='#32cd32')), row=1, col=2)
-    fig.add_hline(y=20, line_dash="dot", line_color="red", row=1, col=2)
-    fig.add_hline(y=80, line_dash="dot", line_color="orange", row=1, col=2)
-    
-    # Grid Stability
-    fig.add_trace(go.Scatter(x=times, y=stability, name='Stability',
-                            fill='tozeroy', line=dict(color='#1f77b4')), row=2, col=1)
-    fig.add_hline(y=70, line_dash="dot", line_color="red", row=2, col=1)
-    fig.add_hline(y=95, line_dash="dot", line_color="green", row=2, col=1)
-    
-    # Grid Import/Export
-    fig.add_trace(go.Scatter(x=times, y=grid_import, name='Grid Import',
-                            fill='tozeroy', line=dict(color='#ff6b6b')), row=2, col=2)
-    
-    # Renewable Utilization
-    renewable_pct = [(s.solar_generation + s.wind_generation) / max(s.load_demand, 1) * 100 for s in states]
-    fig.add_trace(go.Scatter(x=times, y=renewable_pct, name='Renewable %',
-                            fill='tozeroy', line=dict(color='#2ecc71')), row=3, col=1)
-    
-    # Frequency Deviation
-    freq_dev = [s.grid_frequency - 50.0 for s in states]
-    fig.add_trace(go.Scatter(x=times, y=freq_dev, name='Freq Deviation',
-                            line=dict(color='#9b59b6')), row=3, col=2)
-    fig.add_hline(y=0, line_dash="solid", line_color="gray", row=3, col=2)
-    
-    # Update layout
-    fig.update_xaxes(title_text="Time Step", row=3, col=1)
-    fig.update_xaxes(title_text="Time Step", row=3, col=2)
-    fig.update_yaxes(title_text="kW", row=1, col=1)
-    fig.update_yaxes(title_text="%", row=1, col=2)
-    fig.update_yaxes(title_text="%", row=2, col=1)
-    fig.update_yaxes(title_text="kW", row=2, col=2)
-    fig.update_yaxes(title_text="%", row=3, col=1)
-    fig.update_yaxes(title_text="Hz", row=3, col=2)
-    
-    fig.update_layout(height=800, showlegend=True, title_text="Real-Time Grid Monitoring")
-    
-    st.plotly_chart(fig, use_container_width=True)
+    traces = [
+        # Generation & Demand
+        go.Scattergl(name='Solar', line=dict(color='#ffa500')),
+        go.Scattergl(name='Wind', line=dict(color='#4682b4')),
+        go.Scattergl(name='Load', line=dict(color='#dc143c', dash='dash')),
+        # Battery SOC
+        go.Scattergl(name='Battery SOC', fill='tozeroy', line=dict(color='#32cd32')),
+        # Grid Stability
+        go.Scattergl(name='Stability', fill='tozeroy', line=dict(color='#1f77b4')),
+        # Grid Import/Export
+        go.Scattergl(name='Grid Import', fill='tozeroy', line=dict(color='#ff6b6b')),
+        # Renewable Utilization
+        go.Scattergl(name='Renewable %', fill='tozeroy', line=dict(color='#2ecc71')),
+        # Frequency Deviation
+        go.Scattergl(name='Freq Deviation', line=dict(color='#9b59b6')),
+    ]
+    fig.add_traces(traces, rows=[1, 1, 1, 1, 2, 2, 3, 3], cols=[1, 1, 1, 2, 1, 2, 1, 2])
+    
+    # Threshold lines as full-width shapes on each subplot's y axis
+    def hline(axis, y, dash, color):
+        return dict(type='line', xref=f'x{axis} domain', x0=0, x1=1,
+                    yref=f'y{axis}', y0=y, y1=y, line=dict(dash=dash, color=color))
+    
+    shapes = [
+        hline(2, 20, 'dot', 'red'),       # Battery SOC floor
+        hline(2, 80, 'dot', 'orange'),    # Battery SOC ceiling
+        hline(3, 70, 'dot', 'red'),       # Stability alarm
+        hline(3, 95, 'dot', 'green'),     # Stability target
+        hline(6, 0, 'solid', 'gray'),     # Nominal frequency
+    ]
+    
+    # Layout, axis titles and shapes in one update
+    fig.update_layout(
+        height=800, showlegend=True, title_text="Real-Time Grid Monitoring",
+        uirevision='grid_monitor',
+        shapes=shapes,
+        xaxis5_title_text="Time Step", xaxis6_title_text="Time Step",
+        yaxis_title_text="kW", yaxis2_title_text="%", yaxis3_title_text="%",
+        yaxis4_title_text="kW", yaxis5_title_text="%", yaxis6_title_text="Hz"
+    )
+    
+    return fig
+
+def display_realtime_graphs(simulator, history, ai_enabled):
+    """Display real-time monitoring graphs"""
+    mode = 'ai' if ai_enabled else 'rule'
+    
+    if len(history[mode]) < 2:
+        st.info("⏳ Waiting for simulation data...")
+        return
+    
+    hist = history[mode]
+    
+    # Build the figure skeleton once per session; later reruns only swap data
+    # and uirevision keeps the user's zoom/pan between refreshes
+    fig = st.session_state.get('monitor_fig')
+    if fig is None:
+        fig = _build_monitor_skeleton()
+        st.session_state.monitor_fig = fig
+        st.session_state.monitor_key = None
+    
+    # Skip the data refresh on reruns where no step was logged
+    key = (id(hist), hist.write_idx)
+    if st.session_state.monitor_key != key:
+        times = hist['time']
+        
+        # Extract time series data
+        solar = hist['solar_generation']
+        wind = hist['wind_generation']
+        load = hist['load_demand']
+        battery_soc = hist['battery_soc'] * 100
+        stability = hist['stability_score'] * 100
+        grid_import = hist['grid_import']
+        renewable_pct = hist['renewable_pct']
+        freq_dev = hist['grid_frequency'] - 50.0
+        
+        series = (solar, wind, load, battery_soc, stability, grid_import, renewable_pct, freq_dev)
+        with fig.batch_update():
+            for trace, values in zip(fig.data, series):
+                trace.update(downsample_minmax(times, values))
+        st.session_state.monitor_key = key
+    
+    st.plotly_chart(fig, key="realtime_monitor", use_container_width=True)
 
 def display_comparison_charts(history):
     """Display side-by-side comparison charts"""
-    if len(history['ai']['time']) < 2 or len(history['rule']['time']) < 2:
+    if len(history['ai']) < 2 or len(history['rule']) < 2:
         st.info("⏳ Waiting for comparison data...")
         return
     
-    # Calculate metrics for both
-    ai_stability = np.mean([s.stability_score for s in history['ai']['states'][-100:]])
-    rule_stability = np.mean([s.stability_score for s in history['rule']['states'][-100:]])
-    
-    ai_cost = np.mean([s.energy_cost for s in history['ai']['states'][-100:]])
-    rule_cost = np.mean([s.energy_cost for s in history['rule']['states'][-100:]])
+    ai, rule = history['ai'], history['rule']
     
-    ai_outages = sum([1 for s in history['ai']['states'] if s.stability_score < 0.7])
-    rule_outages = sum([1 for s in history['rule']['states'] if s.stability_score < 0.7])
+    # Calculate metrics for both (running aggregates kept by the history)
+    ai_stability = ai.window_mean('stability')
+    rule_stability = rule.window_mean('stability')
     
-    ai_renewable = np.mean([(s.solar_generation + s.wind_generation) / max(s.load_demand, 1) * 100 
-                            for s in history['ai']['states'][-100:]])
-    rule_renewable = np.mean([(s.solar_generation + s.wind_generation) / max(s.load_demand, 1) * 100 
-                              for s in history['rule']['states'][-100:]])
+    ai_cost = ai.window_mean('cost')
+    rule_cost = rule.window_mean('cost')
     
-    # Comparison bar chart
-    fig = go.Figure()
+    ai_outages = ai.outages
+    rule_outages = rule.outages
     
-    metrics = ['Stability (%)', 'Cost (₹)', 'Outages', 'Renewable (%)']
-    ai_values = [ai_stability * 100, ai_cost, ai_outages, ai_renewable]
-    rule_values = [rule_stability * 100, rule_cost, rule_outages, rule_renewable]
+    ai_renewable = ai.window_mean('renewable')
+    rule_renewable = rule.window_mean('renewable')
     
-    fig.add_trace(go.Bar(name='AI Control', x=metrics, y=ai_values, marker_color='#1f77b4'))
-    fig.add_trace(go.Bar(name='Rule-Based', x=metrics, y=rule_values, marker_color='#ff7f0e'))
-    
-    fig.update_layout(title='Performance Comparison: AI vs Rule-Based',
-                     barmode='group', height=400)
+    # Comparison bar chart, rebuilt only when either history has a new step
+    key = (id(ai), ai.write_idx, id(rule), rule.write_idx)
+    cached = st.session_state.get('comparison_fig')
+    if cached is not None and cached[0] == key:
+        fig = cached[1]
+    else:
+        import plotly.graph_objects as go
+        
+        fig = go.Figure()
+        
+        metrics = ['Stability (%)', 'Cost (₹)', 'Outages', 'Renewable (%)']
+        ai_values = [ai_stability * 100, ai_cost, ai_outages, ai_renewable]
+        rule_values = [rule_stability * 100, rule_cost, rule_outages, rule_renewable]
+        
+        fig.add_trace(go.Bar(name='AI Control', x=metrics, y=ai_values, marker_color='#1f77b4'))
+        fig.add_trace(go.Bar(name='Rule-Based', x=metrics, y=rule_values, marker_color='#ff7f0e'))
+        
+        fig.update_layout(title='Performance Comparison: AI vs Rule-Based',
+                         barmode='group', height=400)
+        st.session_state.comparison_fig = (key, fig)
     
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig, key="comparison_chart", use_container_width=True)
     
     # Improvement metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -479,30 +350,43 @@ def display_comparison_charts(history):
         renewable_improvement = (ai_renewable - rule_renewable) / rule_renewable * 100
         st.metric("Renewable Increase", f"{renewable_improvement:+.1f}%")
 
+# Decision-log explanation flag -> message, in display order
+DECISION_REASONS = (
+    (GridHistory.EXPLAIN_CHARGE_LOW_SOC, "✅ Charging battery due to low SOC"),
+    (GridHistory.EXPLAIN_DISCHARGE_DEMAND, "✅ Discharging battery to meet demand"),
+    (GridHistory.EXPLAIN_SHIFT_STABILITY, "✅ Shifting non-critical loads for stability"),
+)
+
 def display_decision_log(simulator, history):
     """Display AI decision explanations"""
     st.subheader("🧠 AI Decision Log")
     
-    if len(history['actions']) < 1:
+    if len(history) < 1:
         st.info("No decisions yet...")
         return
     
-    # Get last few actions
-    recent_actions = history['actions'][-5:]
-    recent_states = history['states'][-5:]
-    recent_rewards = history['rewards'][-5:]
-    
-    for i, (action, state, reward) in enumerate(zip(recent_actions, recent_states, recent_rewards)):
-        with st.expander(f"Step {len(history['actions']) - 5 + i}: Reward = {reward:.2f}"):
+    # Get last few steps
+    steps = history.tail('time', 5)
+    recent_actions = history.tail('actions', 5)
+    recent_rewards = history.tail('rewards', 5)
+    solar = history.tail('solar_generation', 5)
+    wind = history.tail('wind_generation', 5)
+    load = history.tail('load_demand', 5)
+    battery_soc = history.tail('battery_soc', 5)
+    stability = history.tail('stability_score', 5)
+    explain = history.tail('explain', 5)
+    
+    for i, (action, reward) in enumerate(zip(recent_actions, recent_rewards)):
+        with st.expander(f"Step {steps[i]}: Reward = {reward:.2f}"):
             col1, col2 = st.columns(2)
             
             with col1:
                 st.markdown("**State:**")
-                st.write(f"- Solar: {state.solar_generation:.1f} kW")
-                st.write(f"- Wind: {state.wind_generation:.1f} kW")
-                st.write(f"- Load: {state.load_demand:.1f} kW")
-                st.write(f"- Battery SOC: {state.battery_soc:.1%}")
-                st.write(f"- Stability: {state.stability_score:.1%}")
+                st.write(f"- Solar: {solar[i]:.1f} kW")
+                st.write(f"- Wind: {wind[i]:.1f} kW")
+                st.write(f"- Load: {load[i]:.1f} kW")
+                st.write(f"- Battery SOC: {battery_soc[i]:.1%}")
+                st.write(f"- Stability: {stability[i]:.1%}")
             
             with col2:
                 st.markdown("**Action Taken:**")
@@ -512,14 +396,11 @@ def display_decision_log(simulator, history):
                 st.write(f"- Grid Import: {action[3]:.2f}")
                 st.write(f"- Curtailment: {action[4]:.2f}")
                 
-                # Explanation
+                # Explanation (flags precomputed when the step was logged)
                 st.markdown("**Why:**")
-                if state.battery_soc < 0.3 and action[0] > 0.5:
-                    st.write("✅ Charging battery due to low SOC")
-                if state.load_demand > state.solar_generation + state.wind_generation and action[1] > 0.5:
-                    st.write("✅ Discharging battery to meet demand")
-                if state.stability_score < 0.8 and action[2] > 0.3:
-                    st.write("✅ Shifting non-critical loads for stability")
+                for flag, reason in DECISION_REASONS:
+                    if explain[i] & flag:
+                        st.write(reason)
                 if reward > 0:
                     st.success(f"✅ Positive reward: {reward:.2f}")
                 else:
@@ -537,15 +418,16 @@ def display_statistics_summary(simulator, history, ai_enabled):
     
     mode = 'ai' if ai_enabled else 'rule'
     
-    if len(history[mode]['states']) < 10:
+    if len(history[mode]) < 10:
         st.info("⏳ Accumulating statistics...")
         return
     
-    states = history[mode]['states']
+    hist = history[mode]
+    n = hist.write_idx
     
     # Calculate metrics that will be used across columns
-    outages = sum([1 for s in states if s.stability_score < 0.7])
-    outage_pct = (outages / len(states)) * 100
+    outages = hist.outages
+    outage_pct = outages / n * 100
     
     col1, col2, col3, col4 = st.columns(4)
     
@@ -555,111 +437,146 @@ def display_statistics_summary(simulator, history, ai_enabled):
             <h4 style="color: white !important;">⚡ Reliability</h4>
         """, unsafe_allow_html=True)
         
-        avg_stability = np.mean([s.stability_score for s in states]) * 100
-        min_stability = np.min([s.stability_score for s in states]) * 100
-        uptime = (1 - outages / len(states)) * 100
+        avg_stability = hist.mean('stability') * 100
+        uptime = 100 - outage_pct
         
         st.markdown(f"""
             <div class="metric-value">{avg_stability:.1f}%</div>
             <div class="metric-label">Avg Stability</div>
             <p style="color: white; margin: 1rem 0;">Uptime: {uptime:.1f}%</p>
-            <p style="color: white; opacity: 0.8;">Min: {min_stability:.1f}%</p>
+            <p style="color: white; margin: 0;">Outages: {outages}</p>
         </div>
         """, unsafe_allow_html=True)
     
     with col2:
         st.markdown("""
-        <div class="metric-glass-card">
-            <h4 style="color: white !important;">💰 Economics</h4>
+        <div class="metric-glass-card" style="background: linear-gradient(135deg, rgba(249, 199, 79, 0.8), rgba(251, 217, 133, 0.8));">
+            <h4 style="color: white !important;">💰 Cost Metrics</h4>
         """, unsafe_allow_html=True)
         
-        avg_cost = np.mean([s.energy_cost for s in states])
-        total_cost = np.sum([s.energy_cost for s in states])
+        total_cost = hist.totals['cost']
+        avg_cost = total_cost / n
+        
+        # Cost savings vs baseline
+        baseline_cost = 150 * n
+        savings = baseline_cost - total_cost
+        savings_pct = (savings / baseline_cost) * 100
         
         st.markdown(f"""
             <div class="metric-value">₹{avg_cost:.2f}</div>
             <div class="metric-label">Avg Cost/Step</div>
             <p style="color: white; margin: 1rem 0;">Total: ₹{total_cost:.2f}</p>
+            <p style="color: white; margin: 0;">Savings: {savings_pct:.1f}%</p>
         </div>
         """, unsafe_allow_html=True)
     
     with col3:
         st.markdown("""
-        <div class="metric-glass-card">
+        <div class="metric-glass-card" style="background: linear-gradient(135deg, rgba(132, 169, 140, 0.8), rgba(163, 201, 168, 0.8));">
             <h4 style="color: white !important;">🌱 Sustainability</h4>
         """, unsafe_allow_html=True)
         
-        avg_renewable = np.mean([(s.solar_generation + s.wind_generation) / max(s.load_demand, 1) * 100 
-                                 for s in states])
+        avg_renewable = hist.mean('renewable')
+        total_renewable = hist.totals['solar'] + hist.totals['wind']
+        
+        # CO2 savings (assuming 0.82 kg CO2/kWh from grid)
+        co2_saved = total_renewable * 0.82 / 1000  # in tons
         
         st.markdown(f"""
             <div class="metric-value">{avg_renewable:.1f}%</div>
-            <div class="metric-label">Renewable Use</div>
+            <div class="metric-label">Renewable Usage</div>
+            <p style="color: white; margin: 1rem 0;">Total: {total_renewable:.1f} kWh</p>
+            <p style="color: white; margin: 0;">CO₂ Saved: {co2_saved:.2f}t</p>
         </div>
         """, unsafe_allow_html=True)
     
     with col4:
         st.markdown("""
-        <div class="metric-glass-card">
-            <h4 style="color: white !important;">📉 Outages</h4>
+        <div class="metric-glass-card" style="background: linear-gradient(135deg, rgba(244, 67, 54, 0.7), rgba(239, 108, 0, 0.7));">
+            <h4 style="color: white !important;">🛡️ Safety Events</h4>
         """, unsafe_allow_html=True)
         
+        violations = simulator.safety_violations
+        
+        # Safety score
+        safety_score = (1 - violations[TOTAL_VIOLATIONS] / n) * 100
+        
         st.markdown(f"""
-            <div class="metric-value">{outages}</div>
-            <div class="metric-label">Total Outages</div>
-            <p style="color: white; margin: 1rem 0;">Rate: {outage_pct:.1f}%</p>
+            <div class="metric-value">{safety_score:.1f}%</div>
+            <div class="metric-label">Safety Score</div>
+            <p style="color: white; margin: 1rem 0;">Freq: {violations[FREQUENCY_VIOLATIONS]}</p>
+            <p style="color: white; margin: 0;">Total: {violations[TOTAL_VIOLATIONS]}</p>
         </div>
         """, unsafe_allow_html=True)
 
+def rollup(history, window=50):
+    """Recent mean stability and cost plus total outages for one controller"""
+    return {
+        'stability': float(history.tail('stability_score', window).mean()),
+        'cost': float(history.tail('energy_cost', window).mean()),
+        'outages': history.outages,
+    }
+
+def comparison_rollup(history, every=10):
+    """
+    AI and rule-based rollups, recomputed at most once per `every` steps
+    
+    The banner figures move slowly, so the result is memoized in the
+    session until either history advances into a new block of steps.
+    """
+    ai, rule = history['ai'], history['rule']
+    key = (id(ai), ai.write_idx // every, id(rule), rule.write_idx // every)
+    cached = st.session_state.get('comparison_rollup')
+    if cached is None or cached[0] != key:
+        cached = (key, rollup(ai), rollup(rule))
+        st.session_state.comparison_rollup = cached
+    return cached[1], cached[2]
+
+def display_simulation_status(worker):
+    """Report why the background simulation stopped, if it did"""
+    if worker.error is not None:
+        st.error(f"❌ Simulation stopped: {worker.error}. Click Reset to continue.")
+    elif worker.limit_reached:
+        st.warning(f"⚠️ Simulation reached maximum steps ({st.session_state.max_steps}). Click Reset to continue.")
+
+def sync_with_worker():
+    """Trigger a full rerun once the worker stops, so the sidebar catches up"""
+    if st.session_state.simulation_running and not st.session_state.sim_worker.is_running:
+        st.rerun()
+
 # ============================================================================
 # Session State Initialization
 # ============================================================================
 
+warm_up_kernels()
+
 # Initialize session state
 if 'simulator' not in st.session_state:
     st.session_state.simulator = MicrogridDigitalTwin()
     st.session_state.simulator_legacy = MicrogridDigitalTwin()  # Initialize for comparison mode
-    st.session_state.rl_agent = RLAgent(state_dim=13, action_dim=5)  # 13D state (10 current + 3 forecast)
+    saved_agent = load_saved_agent(13, 5)
+    st.session_state.rl_agent = saved_agent or RLAgent(state_dim=13, action_dim=5)  # 13D state (10 current + 3 forecast)
     st.session_state.legacy_controller = LegacyGridController()
-    st.session_state.forecaster = ShortTermForecaster()
+    st.session_state.forecaster = ShortTermForecaster(model=get_forecast_model())
     st.session_state.use_forecasting = True  # Enable predictive mode by default
+    st.session_state.max_steps = 1000  # Safety limit to prevent infinite loops
     st.session_state.history = {
-        'ai': {'time': [], 'states': [], 'actions': [], 'rewards': [], 'events': []},
-        'rule': {'time': [], 'states': [], 'actions': [], 'rewards': [], 'events': []}
+        'ai': GridHistory(capacity=st.session_state.max_steps),
+        'rule': GridHistory(capacity=st.session_state.max_steps)
     }
     st.session_state.current_step = 0
     st.session_state.simulation_running = False
     st.session_state.ai_enabled = True
-    st.session_state.training_complete = False
+    st.session_state.training_complete = saved_agent is not None
     st.session_state.comparison_mode = False
-    st.session_state.max_steps = 1000  # Safety limit to prevent infinite loops
     st.session_state.judge_mode = False  # Simplified judge interface
+    st.session_state.sim_worker = SimulationWorker(controls={})  # Background stepping thread
 
 # Hero Section Header
-st.markdown("""
-    <div class="hero-section">
-        <div class="hero-logo">⚡</div>
-        <h1 class="hero-title">Autonomous AI Grid Manager</h1>
-        <p class="hero-subtitle">Reinforcement Learning for India's Renewable Energy Grids</p>
-        <div style="margin-top: 2rem;">
-            <span class="tech-badge">🤖 PPO Algorithm</span>
-            <span class="tech-badge">🔮 LSTM Forecasting</span>
-            <span class="tech-badge">⚡ Real-Time Control</span>
-            <span class="tech-badge">🌱 32% Cost Savings</span>
-        </div>
-    </div>
-""", unsafe_allow_html=True)
+st.markdown(_load_asset('hero.html'), unsafe_allow_html=True)
 
 # Safety Disclaimer
-st.markdown("""
-    <div style='background: rgba(255, 193, 7, 0.1); padding: 1rem; border-radius: 10px; 
-                border-left: 4px solid #FFC107; margin: 1rem 0;'>
-        <p style='margin: 0; color: #856404; font-size: 0.9rem;'>
-            ⚠️ <strong>Note:</strong> All results are demonstrated on a high-fidelity simulation; 
-            real-world deployment would integrate with SCADA systems and undergo extensive field testing.
-        </p>
-    </div>
-""", unsafe_allow_html=True)
+st.markdown(_load_asset('disclaimer.html'), unsafe_allow_html=True)
 
 # Sidebar Controls
 with st.sidebar:
@@ -726,10 +643,11 @@ with st.sidebar:
             st.rerun()
     
     if st.button("🔄 Reset Simulation", use_container_width=True):
+        st.session_state.sim_worker.reset()
         st.session_state.simulator = MicrogridDigitalTwin()
         st.session_state.history = {
-            'ai': {'time': [], 'states': [], 'actions': [], 'rewards': [], 'events': []},
-            'rule': {'time': [], 'states': [], 'actions': [], 'rewards': [], 'events': []}
+            'ai': GridHistory(capacity=st.session_state.max_steps),
+            'rule': GridHistory(capacity=st.session_state.max_steps)
         }
         st.session_state.current_step = 0
         st.session_state.simulation_running = False
@@ -745,54 +663,11 @@ with st.sidebar:
         if st.button("🚀 Train RL Agent (Quick)", use_container_width=True):
             with st.spinner("Training AI agent..."):
                 progress_bar = st.progress(0)
-                episodes = 50
-                
-                for episode in range(episodes):
-                    temp_sim = MicrogridDigitalTwin()
-                    temp_forecaster = ShortTermForecaster()
-                    
-                    state = temp_sim.get_state_vector()
-                    episode_reward = 0
-                    
-                    for step in range(100):
-                        # Update forecaster
-                        temp_forecaster.update_history(
-                            temp_sim.state.time_of_day,
-                            temp_sim.state.solar_generation,
-                            temp_sim.state.wind_generation,
-                            temp_sim.state.load_demand,
-                            temp_sim.state.cloud_cover,
-                            temp_sim.state.wind_speed,
-                            temp_sim.state.temperature
-                        )
-                        
-                        # Get state with forecast if available
-                        if len(temp_forecaster.history) >= 10:
-                            f_solar, f_wind, f_load = temp_forecaster.predict()
-                            state = temp_sim.get_state_vector(f_solar, f_wind, f_load)
-                        else:
-                            state = temp_sim.get_state_vector()
-                        
-                        action = st.session_state.rl_agent.select_action(state)
-                        next_state, reward, done = temp_sim.step(action)
-                        
-                        # Get next state with forecast
-                        if len(temp_forecaster.history) >= 10:
-                            f_solar, f_wind, f_load = temp_forecaster.predict()
-                            next_state_vec = temp_sim.get_state_vector(f_solar, f_wind, f_load)
-                        else:
-                            next_state_vec = temp_sim.get_state_vector()
-                        
-                        st.session_state.rl_agent.store_transition(state, action, reward, next_state_vec, done)
-                        st.session_state.rl_agent.train_step()
-                        
-                        state = next_state_vec
-                        episode_reward += reward
-                        
-                        if done:
-                            break
-                    
-                    progress_bar.progress((episode + 1) / episodes)
+                st.session_state.rl_agent = get_trained_agent(
+                    state_dim=13, action_dim=5, episodes=50, steps=100, seed=0,
+                    _progress_callback=progress_bar.progress
+                )
+                progress_bar.empty()
                 
                 st.session_state.training_complete = True
                 st.success("✅ Training Complete!")
@@ -800,8 +675,12 @@ with st.sidebar:
     else:
         st.success("✅ Agent Trained")
         if st.button("🔄 Retrain", use_container_width=True):
+            get_trained_agent.clear()
+            load_saved_agent.clear()
+            if AGENT_PATH.exists():
+                AGENT_PATH.unlink()
             st.session_state.training_complete = False
-            st.session_state.rl_agent = RLAgent(state_dim=10, action_dim=5)
+            st.session_state.rl_agent = RLAgent(state_dim=13, action_dim=5)
             st.rerun()
         
         st.divider()
@@ -838,29 +717,90 @@ with st.sidebar:
         if 'sim_speed' not in st.session_state:
             st.session_state.sim_speed = 3  # Medium speed for judges
 
+# Hand the current objects and sidebar settings to the background worker
+worker = st.session_state.sim_worker
+worker.controls.update(
+    simulator=st.session_state.simulator,
+    simulator_legacy=st.session_state.simulator_legacy,
+    rl_agent=st.session_state.rl_agent,
+    legacy_controller=st.session_state.legacy_controller,
+    forecaster=st.session_state.forecaster,
+    history=st.session_state.history,
+    comparison_mode=st.session_state.comparison_mode,
+    ai_enabled=st.session_state.ai_enabled,
+    training_complete=st.session_state.training_complete,
+    use_forecasting=st.session_state.use_forecasting,
+    sim_speed=st.session_state.sim_speed,
+    max_steps=st.session_state.max_steps
+)
+
+if st.session_state.simulation_running:
+    worker.start()
+else:
+    worker.stop()
+
+st.session_state.simulation_running = worker.is_running
+st.session_state.current_step = worker.current_step
+
+# Live panels refresh once per simulation tick while the simulation runs, so
+# only they rerun instead of the sidebar, styles and static sections
+LIVE_REFRESH = 1.0 / st.session_state.sim_speed if st.session_state.simulation_running else None
+
+@st.fragment(run_every=LIVE_REFRESH)
+def comparison_live_panel():
+    """Side-by-side metrics and comparison charts"""
+    sync_with_worker()
+    
+    col_ai, col_rule = st.columns(2)
+    
+    with col_ai:
+        st.subheader("🤖 AI Control")
+        display_metrics(st.session_state.simulator, st.session_state.history['ai'], "ai")
+    
+    with col_rule:
+        st.subheader("📋 Rule-Based Control")
+        if 'simulator_legacy' in st.session_state:
+            display_metrics(st.session_state.simulator_legacy, st.session_state.history['rule'], "rule")
+    
+    # Comparison Charts
+    st.divider()
+    st.subheader("📈 Performance Comparison")
+    display_comparison_charts(st.session_state.history)
+
+@st.fragment(run_every=LIVE_REFRESH)
+def live_panel():
+    """Key metric cards and realtime graphs"""
+    sync_with_worker()
+    
+    mode = 'ai' if st.session_state.ai_enabled else 'rule'
+    display_key_metrics(st.session_state.simulator, st.session_state.history[mode])
+    
+    # Real-time Graphs
+    st.divider()
+    display_realtime_graphs(st.session_state.simulator, st.session_state.history, st.session_state.ai_enabled)
+
 # Main Dashboard
 if st.session_state.comparison_mode:
     # COMPARISON MODE: Side-by-side AI vs Rule-based
     st.header("📊 AI vs Legacy Controller Comparison")
     
     # Performance Banner (if enough data)
-    if len(st.session_state.history['ai']['states']) > 30 and len(st.session_state.history['rule']['states']) > 30:
-        ai_stability = np.mean([s.stability_score for s in st.session_state.history['ai']['states'][-50:]])
-        rule_stability = np.mean([s.stability_score for s in st.session_state.history['rule']['states'][-50:]])
+    if len(st.session_state.history['ai']) > 30 and len(st.session_state.history['rule']) > 30:
+        ai, rule = comparison_rollup(st.session_state.history)
+        
+        ai_stability, rule_stability = ai['stability'], rule['stability']
         stability_improvement = ((ai_stability - rule_stability) / rule_stability) * 100
         
-        ai_cost = np.mean([s.energy_cost for s in st.session_state.history['ai']['states'][-50:]])
-        rule_cost = np.mean([s.energy_cost for s in st.session_state.history['rule']['states'][-50:]])
+        ai_cost, rule_cost = ai['cost'], rule['cost']
         cost_savings = ((rule_cost - ai_cost) / rule_cost) * 100
         
-        ai_outages = sum([1 for s in st.session_state.history['ai']['states'] if s.stability_score < 0.7])
-        rule_outages = sum([1 for s in st.session_state.history['rule']['states'] if s.stability_score < 0.7])
+        ai_outages, rule_outages = ai['outages'], rule['outages']
         
         outage_factor = (rule_outages / max(ai_outages, 1)) if ai_outages > 0 else rule_outages
         
         # Safety violations comparison
-        ai_violations = st.session_state.simulator.safety_violations['total_violations']
-        legacy_violations = st.session_state.simulator_legacy.safety_violations['total_violations'] if 'simulator_legacy' in st.session_state else 0
+        ai_violations = st.session_state.simulator.safety_violations[TOTAL_VIOLATIONS]
+        legacy_violations = st.session_state.simulator_legacy.safety_violations[TOTAL_VIOLATIONS] if 'simulator_legacy' in st.session_state else 0
         
         safety_improvement = 0
         if legacy_violations > 0:
@@ -891,177 +831,17 @@ if st.session_state.comparison_mode:
             </div>
         """, unsafe_allow_html=True)
     
-    col_ai, col_rule = st.columns(2)
-    
-    with col_ai:
-        st.subheader("🤖 AI Control")
-    with col_rule:
-        st.subheader("📋 Rule-Based Control")
-    
-    # Run both simulators if simulation is active
-    if st.session_state.simulation_running:
-        # Safety check: stop if max steps reached
-        if st.session_state.current_step >= st.session_state.max_steps:
-            st.session_state.simulation_running = False
-            st.warning(f"⚠️ Simulation reached maximum steps ({st.session_state.max_steps}). Click Reset to continue.")
-        else:
-            # Update forecaster for AI simulator
-            st.session_state.forecaster.update_history(
-                st.session_state.simulator.state.time_of_day,
-                st.session_state.simulator.state.solar_generation,
-                st.session_state.simulator.state.wind_generation,
-                st.session_state.simulator.state.load_demand,
-                st.session_state.simulator.state.cloud_cover,
-                st.session_state.simulator.state.wind_speed,
-                st.session_state.simulator.state.temperature
-            )
-            
-            # AI Simulator with forecast
-            if st.session_state.use_forecasting and len(st.session_state.forecaster.history) >= 10:
-                forecast_solar, forecast_wind, forecast_load = st.session_state.forecaster.predict()
-                state_ai = st.session_state.simulator.get_state_vector(
-                    forecast_solar, forecast_wind, forecast_load
-                )
-            else:
-                state_ai = st.session_state.simulator.get_state_vector()
-            
-            action_ai = st.session_state.rl_agent.select_action(state_ai) if st.session_state.training_complete else np.array([0, 0, 0, 0, 0])
-            next_state_ai, reward_ai, _ = st.session_state.simulator.step(action_ai)
-            
-            # Rule-based Simulator (separate instance for comparison - no forecast)
-            if 'simulator_legacy' not in st.session_state:
-                st.session_state.simulator_legacy = MicrogridDigitalTwin()
-            
-            state_rule = st.session_state.simulator_legacy.get_state_vector()  # Legacy doesn't use forecast
-            action_rule = st.session_state.legacy_controller.get_action(st.session_state.simulator_legacy.state)
-            next_state_rule, reward_rule, _ = st.session_state.simulator_legacy.step(action_rule)
-            
-            # Store history
-            current_time = st.session_state.current_step
-            st.session_state.history['ai']['time'].append(current_time)
-            st.session_state.history['ai']['states'].append(st.session_state.simulator.state)
-            st.session_state.history['ai']['actions'].append(action_ai)
-            st.session_state.history['ai']['rewards'].append(reward_ai)
-            
-            st.session_state.history['rule']['time'].append(current_time)
-            st.session_state.history['rule']['states'].append(st.session_state.simulator_legacy.state)
-            st.session_state.history['rule']['actions'].append(action_rule)
-            st.session_state.history['rule']['rewards'].append(reward_rule)
-            
-            st.session_state.current_step += 1
-            
-            time.sleep(1.0 / st.session_state.sim_speed)
-            st.rerun()
+    display_simulation_status(st.session_state.sim_worker)
     
     # Display metrics for both
-    col_ai, col_rule = st.columns(2)
-    
-    with col_ai:
-        display_metrics(st.session_state.simulator, st.session_state.history['ai'], "ai")
-    
-    with col_rule:
-        if 'simulator_legacy' in st.session_state:
-            display_metrics(st.session_state.simulator_legacy, st.session_state.history['rule'], "rule")
-    
-    # Comparison Charts
-    st.divider()
-    st.subheader("📈 Performance Comparison")
-    display_comparison_charts(st.session_state.history)
+    comparison_live_panel()
     
 else:
     # SINGLE MODE: Just AI or Rule-based
-    # Key Metrics Dashboard
-    col1, col2, col3, col4 = st.columns(4)
-    
-    state = st.session_state.simulator.state
-    
-    with col1:
-        st.metric(
-            "Grid Stability",
-            f"{state.stability_score:.1%}",
-            f"{state.stability_score - 0.95:.1%}" if len(st.session_state.history['ai']['states']) > 0 else None
-        )
+    display_simulation_status(st.session_state.sim_worker)
     
-    with col2:
-        st.metric(
-            "Battery SOC",
-            f"{state.battery_soc:.1%}",
-            f"{state.battery_charge_rate:.2f} kW/s"
-        )
-    
-    with col3:
-        renewable_pct = (state.solar_generation + state.wind_generation) / max(state.load_demand, 1) * 100
-        st.metric(
-            "Renewable %",
-            f"{renewable_pct:.1f}%",
-            f"{renewable_pct - 75:.1f}%"
-        )
-    
-    with col4:
-        cost = state.energy_cost
-        st.metric(
-            "Energy Cost",
-            f"₹{cost:.2f}",
-            f"₹{-abs(cost - 100):.2f}" if cost < 100 else f"₹{cost - 100:.2f}"
-        )
-    
-    # Run simulation step if active
-    if st.session_state.simulation_running:
-        # Safety check: stop if max steps reached
-        if st.session_state.current_step >= st.session_state.max_steps:
-            st.session_state.simulation_running = False
-            st.warning(f"⚠️ Simulation reached maximum steps ({st.session_state.max_steps}). Click Reset to continue.")
-        else:
-            state_vec = st.session_state.simulator.get_state_vector()
-        
-        # Update forecaster with current observations
-        st.session_state.forecaster.update_history(
-            st.session_state.simulator.state.time_of_day,
-            st.session_state.simulator.state.solar_generation,
-            st.session_state.simulator.state.wind_generation,
-            st.session_state.simulator.state.load_demand,
-            st.session_state.simulator.state.cloud_cover,
-            st.session_state.simulator.state.wind_speed,
-            st.session_state.simulator.state.temperature
-        )
-        
-        # Get forecast for next step (predictive mode)
-        if st.session_state.use_forecasting and len(st.session_state.forecaster.history) >= 10:
-            forecast_solar, forecast_wind, forecast_load = st.session_state.forecaster.predict()
-            
-            # Create state vector WITH forecast
-            state_vec = st.session_state.simulator.get_state_vector(
-                forecast_solar, forecast_wind, forecast_load
-            )
-        else:
-            # Reactive mode (no forecast)
-            state_vec = st.session_state.simulator.get_state_vector()
-        
-        if st.session_state.ai_enabled and st.session_state.training_complete:
-            action = st.session_state.rl_agent.select_action(state_vec)
-        elif st.session_state.ai_enabled:
-            action = st.session_state.legacy_controller.get_action(st.session_state.simulator.state)
-        else:
-            action = st.session_state.legacy_controller.get_action(st.session_state.simulator.state)
-        
-        next_state, reward, done = st.session_state.simulator.step(action)
-        
-        # Store history
-        current_time = st.session_state.current_step
-        mode = 'ai' if st.session_state.ai_enabled else 'rule'
-        st.session_state.history[mode]['time'].append(current_time)
-        st.session_state.history[mode]['states'].append(st.session_state.simulator.state)
-        st.session_state.history[mode]['actions'].append(action)
-        st.session_state.history[mode]['rewards'].append(reward)
-        
-        st.session_state.current_step += 1
-        
-        time.sleep(1.0 / st.session_state.sim_speed)
-        st.rerun()
-    
-    # Real-time Graphs
-    st.divider()
-    display_realtime_graphs(st.session_state.simulator, st.session_state.history, st.session_state.ai_enabled)
+    # Key metrics and real-time graphs
+    live_panel()
     
     # AI Decision Log
     if st.session_state.ai_enabled and st.session_state.training_complete:
@@ -1070,6 +850,15 @@ else:
         # What the AI Learned section
         st.subheader("🧠 What the AI Learned")
         
+        ai_hist = st.session_state.history['ai']
+        if len(ai_hist) > 50:
+            (avg_charge_on_surplus, avg_discharge_on_deficit, low_soc_moments,
+             high_import_actions, battery_first_frac, avg_cost,
+             pre_cloud_charge) = fused_behaviour_summary(
+                ai_hist['solar_generation'], ai_hist['wind_generation'],
+                ai_hist['load_demand'], ai_hist['battery_soc'], ai_hist['energy_cost'],
+                ai_hist['cloud_cover'], ai_hist['actions'], len(ai_hist))
+        
         col1, col2, col3 = st.columns(3)
         
         with col1:
@@ -1078,25 +867,17 @@ else:
                 <strong>🔋 Battery Strategy</strong>
             """, unsafe_allow_html=True)
             
-            if len(st.session_state.history['ai']['states']) > 50:
-                states = st.session_state.history['ai']['states']
-                actions = st.session_state.history['ai']['actions']
-                
+            if len(ai_hist) > 50:
                 # Analyze battery charging behavior
-                surplus_moments = [i for i, s in enumerate(states) if (s.solar_generation + s.wind_generation) > s.load_demand]
-                if surplus_moments:
-                    avg_charge_on_surplus = np.mean([actions[i][0] for i in surplus_moments if i < len(actions)])
+                if not np.isnan(avg_charge_on_surplus):
                     st.write(f"✅ Charges battery {avg_charge_on_surplus*100:.0f}% during surplus")
                 
                 # Analyze discharge behavior
-                deficit_moments = [i for i, s in enumerate(states) if s.load_demand > (s.solar_generation + s.wind_generation)]
-                if deficit_moments:
-                    avg_discharge_on_deficit = np.mean([actions[i][1] for i in deficit_moments if i < len(actions)])
+                if not np.isnan(avg_discharge_on_deficit):
                     st.write(f"✅ Discharges {avg_discharge_on_deficit*100:.0f}% during deficit")
                 
                 # Deep discharge avoidance
-                low_soc_moments = [s.battery_soc for s in states if s.battery_soc < 0.2]
-                st.write(f"✅ Avoided deep discharge: {len(low_soc_moments)} times")
+                st.write(f"✅ Avoided deep discharge: {low_soc_moments} times")
             else:
                 st.info("Learning in progress...")
             
@@ -1107,17 +888,14 @@ else:
             <div class="glass-alert-info">
                 <strong>⚡ Grid Import Behavior</strong>
             """, unsafe_allow_html=True)
-            if len(st.session_state.history['ai']['states']) > 50:
+            if len(ai_hist) > 50:
                 # Preference for battery over grid
-                high_import_actions = [a[3] for a in actions if a[3] > 0.7]
-                st.write(f"⚡ High grid imports: {len(high_import_actions)} times")
+                st.write(f"⚡ High grid imports: {high_import_actions} times")
                 
                 # Battery discharge preference
-                battery_first = sum([1 for i, a in enumerate(actions) if a[1] > a[3] and i < len(states)])
-                st.write(f"✅ Prefers battery over grid: {battery_first/len(actions)*100:.0f}% of time")
+                st.write(f"✅ Prefers battery over grid: {battery_first_frac*100:.0f}% of time")
                 
                 # Cost optimization
-                avg_cost = np.mean([s.energy_cost for s in states])
                 st.write(f"💰 Average cost: ₹{avg_cost:.2f}/step")
             else:
                 st.info("Learning in progress...")
@@ -1129,38 +907,29 @@ else:
             <div class="glass-alert-warning">
                 <strong>🔮 Predictive Behavior</strong>
             """, unsafe_allow_html=True)
-            if len(st.session_state.history['ai']['states']) > 50:
+            if len(ai_hist) > 50:
                 # Show if forecasting is being used
                 if st.session_state.use_forecasting:
                     st.success("🔮 Using LSTM Forecasts")
                     st.write("✅ State dimension: 13D (with predictions)")
                     
                     # Show forecast accuracy if available
-                    if len(st.session_state.forecaster.history) >= 10:
+                    if st.session_state.forecaster.has_forecast:
                         st.write(f"📊 Forecast buffer: {len(st.session_state.forecaster.history)} samples")
                 else:
                     st.info("⚡ Reactive Mode")
                     st.write("State dimension: 10D (current only)")
                 
-                # Cloud anticipation
-                cloud_events = [i for i, s in enumerate(states) if s.cloud_cover > 0.7]
-                if cloud_events:
-                    pre_cloud_charging = []
-                    for ce in cloud_events:
-                        if ce > 5:  # Look back 5 steps
-                            pre_charge = np.mean([actions[i][0] for i in range(ce-5, ce) if i < len(actions)])
-                            pre_cloud_charging.append(pre_charge)
-                    
-                    if pre_cloud_charging:
-                        st.write(f"☁️ Pre-charges before clouds: {np.mean(pre_cloud_charging)*100:.0f}%")
+                # Cloud anticipation (mean charge over the 5 steps before a cloud event)
+                if not np.isnan(pre_cloud_charge):
+                    st.write(f"☁️ Pre-charges before clouds: {pre_cloud_charge*100:.0f}%")
                 
                 # Peak demand anticipation
-                peak_loads = [i for i, s in enumerate(states) if s.load_demand > 700]
-                st.write(f"📈 Handled {len(peak_loads)} peak demand events")
+                st.write(f"📈 Handled {ai_hist.peak_load_count} peak demand events")
                 
                 # Stability maintenance
-                high_stability = sum([1 for s in states if s.stability_score > 0.9])
-                st.write(f"✅ High stability: {high_stability/len(states)*100:.0f}% uptime")
+                high_stability_frac = ai_hist.high_stability_count / ai_hist.write_idx
+                st.write(f"✅ High stability: {high_stability_frac*100:.0f}% uptime")
             else:
                 st.info("Learning in progress...")
             
@@ -1173,332 +942,6 @@ else:
 st.divider()
 display_statistics_summary(st.session_state.simulator, st.session_state.history, st.session_state.ai_enabled)
 
-# Footer
-def display_metrics(simulator, history, mode):
-    """Display key metrics for a simulator"""
-    state = simulator.state
-    
-    st.metric("Stability", f"{state.stability_score:.1%}")
-    st.metric("Battery", f"{state.battery_soc:.1%}")
-    st.metric("Cost", f"₹{state.energy_cost:.2f}")
-    
-    if len(history['states']) > 10:
-        avg_stability = np.mean([s.stability_score for s in history['states'][-100:]])
-        avg_cost = np.mean([s.energy_cost for s in history['states'][-100:]])
-        outages = sum([1 for s in history['states'] if s.stability_score < 0.7])
-        
-        st.metric("Avg Stability", f"{avg_stability:.1%}")
-        st.metric("Avg Cost", f"₹{avg_cost:.2f}")
-        st.metric("Outages", f"{outages}")
-
-def display_realtime_graphs(simulator, history, ai_enabled):
-    """Display real-time monitoring graphs"""
-    mode = 'ai' if ai_enabled else 'rule'
-    
-    if len(history[mode]['time']) < 2:
-        st.info("⏳ Waiting for simulation data...")
-        return
-    
-    times = history[mode]['time']
-    states = history[mode]['states']
-    
-    # Extract time series data
-    solar = [s.solar_generation for s in states]
-    wind = [s.wind_generation for s in states]
-    load = [s.load_demand for s in states]
-    battery_soc = [s.battery_soc * 100 for s in states]
-    stability = [s.stability_score * 100 for s in states]
-    grid_import = [s.grid_import for s in states]
-    
-    # Create subplots
-    fig = make_subplots(
-        rows=3, cols=2,
-        subplot_titles=('Generation & Demand', 'Battery State of Charge',
-                       'Grid Stability', 'Grid Import/Export',
-                       'Renewable Utilization', 'Frequency Deviation'),
-        vertical_spacing=0.12,
-        horizontal_spacing=0.1
-    )
-    
-    # Generation & Demand
-    fig.add_trace(go.Scatter(x=times, y=solar, name='Solar', line=dict(color='#ffa500')), row=1, col=1)
-    fig.add_trace(go.Scatter(x=times, y=wind, name='Wind', line=dict(color='#4682b4')), row=1, col=1)
-    fig.add_trace(go.Scatter(x=times, y=load, name='Load', line=dict(color='#dc143c', dash='dash')), row=1, col=1)
-    
-    # Battery SOC
-    fig.add_trace(go.Scatter(x=times, y=battery_soc, name='Battery SOC', 
-                            fill='tozeroy', line=dict(color='#32cd32')), row=1, col=2)
-    fig.add_hline(y=20, line_dash="dot", line_color="red", row=1, col=2)
-    fig.add_hline(y=80, line_dash="dot", line_color="orange", row=1, col=2)
-    
-    # Grid Stability
-    fig.add_trace(go.Scatter(x=times, y=stability, name='Stability',
-                            fill='tozeroy', line=dict(color='#1f77b4')), row=2, col=1)
-    fig.add_hline(y=70, line_dash="dot", line_color="red", row=2, col=1)
-    fig.add_hline(y=95, line_dash="dot", line_color="green", row=2, col=1)
-    
-    # Grid Import/Export
-    fig.add_trace(go.Scatter(x=times, y=grid_import, name='Grid Import',
-                            fill='tozeroy', line=dict(color='#ff6b6b')), row=2, col=2)
-    
-    # Renewable Utilization
-    renewable_pct = [(s.solar_generation + s.wind_generation) / max(s.load_demand, 1) * 100 for s in states]
-    fig.add_trace(go.Scatter(x=times, y=renewable_pct, name='Renewable %',
-                            fill='tozeroy', line=dict(color='#2ecc71')), row=3, col=1)
-    
-    # Frequency Deviation
-    freq_dev = [s.grid_frequency - 50.0 for s in states]
-    fig.add_trace(go.Scatter(x=times, y=freq_dev, name='Freq Deviation',
-                            line=dict(color='#9b59b6')), row=3, col=2)
-    fig.add_hline(y=0, line_dash="solid", line_color="gray", row=3, col=2)
-    
-    # Update layout
-    fig.update_xaxes(title_text="Time Step", row=3, col=1)
-    fig.update_xaxes(title_text="Time Step", row=3, col=2)
-    fig.update_yaxes(title_text="kW", row=1, col=1)
-    fig.update_yaxes(title_text="%", row=1, col=2)
-    fig.update_yaxes(title_text="%", row=2, col=1)
-    fig.update_yaxes(title_text="kW", row=2, col=2)
-    fig.update_yaxes(title_text="%", row=3, col=1)
-    fig.update_yaxes(title_text="Hz", row=3, col=2)
-    
-    fig.update_layout(height=800, showlegend=True, title_text="Real-Time Grid Monitoring")
-    
-    st.plotly_chart(fig, use_container_width=True)
-
-def display_comparison_charts(history):
-    """Display side-by-side comparison charts"""
-    if len(history['ai']['time']) < 2 or len(history['rule']['time']) < 2:
-        st.info("⏳ Waiting for comparison data...")
-        return
-    
-    # Calculate metrics for both
-    ai_stability = np.mean([s.stability_score for s in history['ai']['states'][-100:]])
-    rule_stability = np.mean([s.stability_score for s in history['rule']['states'][-100:]])
-    
-    ai_cost = np.mean([s.energy_cost for s in history['ai']['states'][-100:]])
-    rule_cost = np.mean([s.energy_cost for s in history['rule']['states'][-100:]])
-    
-    ai_outages = sum([1 for s in history['ai']['states'] if s.stability_score < 0.7])
-    rule_outages = sum([1 for s in history['rule']['states'] if s.stability_score < 0.7])
-    
-    ai_renewable = np.mean([(s.solar_generation + s.wind_generation) / max(s.load_demand, 1) * 100 
-                            for s in history['ai']['states'][-100:]])
-    rule_renewable = np.mean([(s.solar_generation + s.wind_generation) / max(s.load_demand, 1) * 100 
-                              for s in history['rule']['states'][-100:]])
-    
-    # Comparison bar chart
-    fig = go.Figure()
-    
-    metrics = ['Stability (%)', 'Cost (₹)', 'Outages', 'Renewable (%)']
-    ai_values = [ai_stability * 100, ai_cost, ai_outages, ai_renewable]
-    rule_values = [rule_stability * 100, rule_cost, rule_outages, rule_renewable]
-    
-    fig.add_trace(go.Bar(name='AI Control', x=metrics, y=ai_values, marker_color='#1f77b4'))
-    fig.add_trace(go.Bar(name='Rule-Based', x=metrics, y=rule_values, marker_color='#ff7f0e'))
-    
-    fig.update_layout(title='Performance Comparison: AI vs Rule-Based',
-                     barmode='group', height=400)
-    
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Improvement metrics
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        improvement = (ai_stability - rule_stability) / rule_stability * 100
-        st.metric("Stability Improvement", f"{improvement:+.1f}%")
-    
-    with col2:
-        cost_saving = (rule_cost - ai_cost) / rule_cost * 100
-        st.metric("Cost Savings", f"{cost_saving:+.1f}%")
-    
-    with col3:
-        outage_reduction = (rule_outages - ai_outages) / max(rule_outages, 1) * 100
-        st.metric("Outage Reduction", f"{outage_reduction:+.1f}%")
-    
-    with col4:
-        renewable_improvement = (ai_renewable - rule_renewable) / rule_renewable * 100
-        st.metric("Renewable Increase", f"{renewable_improvement:+.1f}%")
-
-def display_decision_log(simulator, history):
-    """Display AI decision explanations"""
-    st.subheader("🧠 AI Decision Log")
-    
-    if len(history['actions']) < 1:
-        st.info("No decisions yet...")
-        return
-    
-    # Get last few actions
-    recent_actions = history['actions'][-5:]
-    recent_states = history['states'][-5:]
-    recent_rewards = history['rewards'][-5:]
-    
-    for i, (action, state, reward) in enumerate(zip(recent_actions, recent_states, recent_rewards)):
-        with st.expander(f"Step {len(history['actions']) - 5 + i}: Reward = {reward:.2f}"):
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("**State:**")
-                st.write(f"- Solar: {state.solar_generation:.1f} kW")
-                st.write(f"- Wind: {state.wind_generation:.1f} kW")
-                st.write(f"- Load: {state.load_demand:.1f} kW")
-                st.write(f"- Battery SOC: {state.battery_soc:.1%}")
-                st.write(f"- Stability: {state.stability_score:.1%}")
-            
-            with col2:
-                st.markdown("**Action Taken:**")
-                st.write(f"- Battery Charge: {action[0]:.2f}")
-                st.write(f"- Battery Discharge: {action[1]:.2f}")
-                st.write(f"- Load Shift: {action[2]:.2f}")
-                st.write(f"- Grid Import: {action[3]:.2f}")
-                st.write(f"- Curtailment: {action[4]:.2f}")
-                
-                # Explanation
-                st.markdown("**Why:**")
-                if state.battery_soc < 0.3 and action[0] > 0.5:
-                    st.write("✅ Charging battery due to low SOC")
-                if state.load_demand > state.solar_generation + state.wind_generation and action[1] > 0.5:
-                    st.write("✅ Discharging battery to meet demand")
-                if state.stability_score < 0.8 and action[2] > 0.3:
-                    st.write("✅ Shifting non-critical loads for stability")
-                if reward > 0:
-                    st.success(f"✅ Positive reward: {reward:.2f}")
-                else:
-                    st.warning(f"⚠️ Negative reward: {reward:.2f}")
-
-def display_statistics_summary(simulator, history, ai_enabled):
-    """Display comprehensive statistics with glassmorphism cards"""
-    st.markdown("""
-        <div class="glass-card">
-            <h2 style="color: #2C5F2D !important; text-align: center;">📊 Grid Performance Statistics</h2>
-        </div>
-    """, unsafe_allow_html=True)
-    
-    st.markdown("<br>", unsafe_allow_html=True)
-    
-    mode = 'ai' if ai_enabled else 'rule'
-    
-    if len(history[mode]['states']) < 10:
-        st.info("⏳ Accumulating statistics...")
-        return
-    
-    states = history[mode]['states']
-    
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.markdown("""
-        <div class="metric-glass-card">
-            <h4 style="color: white !important;">⚡ Reliability</h4>
-        """, unsafe_allow_html=True)
-        
-        avg_stability = np.mean([s.stability_score for s in states]) * 100
-        min_stability = np.min([s.stability_score for s in states]) * 100
-        outages = sum([1 for s in states if s.stability_score < 0.7])
-        uptime = (1 - outages / len(states)) * 100
-        
-        st.markdown(f"""
-            <div class="metric-value">{avg_stability:.1f}%</div>
-            <div class="metric-label">Avg Stability</div>
-            <p style="color: white; margin: 1rem 0;">Uptime: {uptime:.1f}%</p>
-            <p style="color: white; margin: 0;">Outages: {outages}</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("""
-        <div class="metric-glass-card" style="background: linear-gradient(135deg, rgba(249, 199, 79, 0.8), rgba(251, 217, 133, 0.8));">
-            <h4 style="color: white !important;">💰 Cost Metrics</h4>
-        """, unsafe_allow_html=True)
-        
-        total_cost = sum([s.energy_cost for s in states])
-        avg_cost = np.mean([s.energy_cost for s in states])
-        
-        # Cost savings vs baseline
-        baseline_cost = 150 * len(states)
-        savings = baseline_cost - total_cost
-        savings_pct = (savings / baseline_cost) * 100
-        
-        st.markdown(f"""
-            <div class="metric-value">₹{avg_cost:.2f}</div>
-            <div class="metric-label">Avg Cost/Step</div>
-            <p style="color: white; margin: 1rem 0;">Total: ₹{total_cost:.2f}</p>
-            <p style="color: white; margin: 0;">Savings: {savings_pct:.1f}%</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown("""
-        <div class="metric-glass-card" style="background: linear-gradient(135deg, rgba(132, 169, 140, 0.8), rgba(163, 201, 168, 0.8));">
-            <h4 style="color: white !important;">🌱 Sustainability</h4>
-        """, unsafe_allow_html=True)
-        
-        avg_renewable = np.mean([(s.solar_generation + s.wind_generation) / max(s.load_demand, 1) * 100 
-                                 for s in states])
-        total_solar = sum([s.solar_generation for s in states])
-        total_wind = sum([s.wind_generation for s in states])
-        total_renewable = total_solar + total_wind
-        
-        # CO2 savings (assuming 0.82 kg CO2/kWh from grid)
-        co2_saved = total_renewable * 0.82 / 1000  # in tons
-        
-        st.markdown(f"""
-            <div class="metric-value">{avg_renewable:.1f}%</div>
-            <div class="metric-label">Renewable Usage</div>
-            <p style="color: white; margin: 1rem 0;">Total: {total_renewable:.1f} kWh</p>
-            <p style="color: white; margin: 0;">CO₂ Saved: {co2_saved:.2f}t</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col4:
-        st.markdown("""
-        <div class="metric-glass-card" style="background: linear-gradient(135deg, rgba(244, 67, 54, 0.7), rgba(239, 108, 0, 0.7));">
-            <h4 style="color: white !important;">🛡️ Safety Events</h4>
-        """, unsafe_allow_html=True)
-        
-        violations = simulator.safety_violations
-        
-        # Safety score
-        if len(states) > 0:
-            safety_score = (1 - violations['total_violations'] / len(states)) * 100
-            
-            st.markdown(f"""
-                <div class="metric-value">{safety_score:.1f}%</div>
-                <div class="metric-label">Safety Score</div>
-                <p style="color: white; margin: 1rem 0;">Freq: {violations['frequency_violations']}</p>
-                <p style="color: white; margin: 0;">Total: {violations['total_violations']}</p>
-            </div>
-            """, unsafe_allow_html=True)
-
 # Footer
 st.divider()
-st.markdown("""
-    <div class="footer">
-        <div class="hero-logo" style="font-size: 2.5rem;">⚡</div>
-        <h3 style="color: #2C5F2D !important; margin: 1rem 0;">Autonomous AI Grid Manager</h3>
-        <p style="font-size: 1.2rem; color: #6B7280; margin-bottom: 1.5rem;">
-            AI-Powered Grid Control — Stabilizing India's Renewable Energy Future
-        </p>
-        <div style="margin: 1.5rem 0;">
-            <span class="tech-badge">🤖 PPO Algorithm</span>
-            <span class="tech-badge">🔮 LSTM Forecasting</span>
-            <span class="tech-badge">⚡ Real-Time Control</span>
-            <span class="tech-badge">🌱 32% Cost Savings</span>
-            <span class="tech-badge">🛡️ Safety Monitoring</span>
-        </div>
-        <div style="margin: 2rem 0;">
-            <a href="https://github.com" style="color: #A3C9A8; text-decoration: none; margin: 0 1rem;">GitHub</a>
-            <a href="#" style="color: #A3C9A8; text-decoration: none; margin: 0 1rem;">Documentation</a>
-            <a href="#" style="color: #A3C9A8; text-decoration: none; margin: 0 1rem;">API</a>
-            <a href="#" style="color: #A3C9A8; text-decoration: none; margin: 0 1rem;">Contact</a>
-        </div>
-        <p style="opacity: 0.7; font-size: 0.95rem; margin-top: 2rem;">
-            Built for India's Renewable Energy Transition 🇮🇳<br>
-            Powered by PyTorch + Streamlit + PPO | © 2025 AI Grid Manager
-        </p>
-        <p style="opacity: 0.6; font-size: 0.85rem; margin-top: 1rem;">
-            Version 1.0.0 | Open Source
-        </p>
-    </div>
-""", unsafe_allow_html=True)
+st.markdown(_load_asset('footer.html'), unsafe_allow_html=True)
@@ -5,18 +5,29 @@ This package contains the core components:
 - grid_simulator: High-fidelity digital twin of microgrid
 - rl_agent: PPO-based reinforcement learning agent
 - forecaster: LSTM-based short-term forecasting
+- history: Struct-of-arrays log of simulation steps
+- sim_worker: Background thread that steps the simulators
+- training: Quick PPO training loop and batched policy evaluation
 """
 
-from .grid_simulator import MicrogridDigitalTwin, GridState
+from .grid_simulator import MicrogridDigitalTwin, MicrogridBatch, GridState
 from .rl_agent import RLAgent, LegacyGridController
 from .forecaster import ShortTermForecaster
+from .history import GridHistory
+from .sim_worker import SimulationWorker
+from .training import train_agent, evaluate_policy_batch
 
 __all__ = [
     'MicrogridDigitalTwin',
+    'MicrogridBatch',
     'GridState',
     'RLAgent',
     'LegacyGridController',
-    'ShortTermForecaster'
+    'ShortTermForecaster',
+    'GridHistory',
+    'SimulationWorker',
+    'train_agent',
+    'evaluate_policy_batch'
 ]
 
 __version__ = '1.0.0'
@@ -3,16 +3,54 @@ Short-Term Forecasting Module
 LSTM-based prediction for solar, wind, and load
 """
 
+import copy
+import warnings
 import numpy as np
 import torch
 import torch.nn as nn
-from collections import deque
-from typing import Tuple, List
+from numba import njit
+from typing import Tuple, List, Optional
+
+
+@njit(cache=True)
+def _write_observation(buffer, slot, capacity, time_of_day, solar, wind, load,
+                       cloud_cover, wind_speed, temperature):
+    """Normalize one observation into a history row and its mirror"""
+    row = buffer[slot]
+    row[0] = time_of_day / 24.0
+    row[1] = solar / 500.0
+    row[2] = wind / 300.0
+    row[3] = load / 1000.0
+    row[4] = cloud_cover
+    row[5] = wind_speed / 25.0
+    row[6] = temperature / 50.0
+    buffer[slot + capacity] = row
+
+
+@njit(cache=True, fastmath=True)
+def _seasonal_mean(time, solar, wind, load, time_of_day, n):
+    """Means of the first n observations within an hour of time_of_day"""
+    solar_sum = 0.0
+    wind_sum = 0.0
+    load_sum = 0.0
+    count = 0
+    for i in range(n):
+        if abs(time[i] - time_of_day) < 1.0:
+            solar_sum += solar[i]
+            wind_sum += wind[i]
+            load_sum += load[i]
+            count += 1
+    if count == 0:
+        return 0.0, 0.0, 0.0, 0
+    return solar_sum / count, wind_sum / count, load_sum / count, count
 
 
 class LSTMForecaster(nn.Module):
     """LSTM network for time series forecasting"""
     
+    # Normalized solar/wind/load outputs -> kW
+    OUTPUT_SCALE = (500.0, 300.0, 1000.0)
+    
     def __init__(self, input_dim: int, hidden_dim: int = 64, num_layers: int = 2):
         super(LSTMForecaster, self).__init__()
         
@@ -28,6 +66,11 @@ class LSTMForecaster(nn.Module):
         )
         
         self.fc = nn.Linear(hidden_dim, 3)  # Predict solar, wind, load
+        
+        # fc weights with OUTPUT_SCALE folded in, rebuilt when fc changes
+        self._output_scale = torch.tensor(self.OUTPUT_SCALE)
+        self._folded_fc = None
+        self._folded_version = None
     
     def forward(self, x):
         # x shape: (batch, sequence, features)
@@ -40,6 +83,26 @@ class LSTMForecaster(nn.Module):
         prediction = self.fc(last_output)
         
         return prediction
+    
+    def forward_kw(self, x):
+        """
+        Forward pass returning solar, wind and load directly in kW
+        
+        The de-normalization is folded into a scaled copy of the fc layer,
+        refreshed whenever training or load_state_dict bumps its version.
+        """
+        lstm_out, _ = self.lstm(x)
+        return nn.functional.linear(lstm_out[:, -1, :], *self.folded_fc())
+    
+    def folded_fc(self) -> Tuple[torch.Tensor, torch.Tensor]:
+        """(weight, bias) of the fc layer scaled to kW outputs"""
+        version = (self.fc.weight._version, self.fc.bias._version)
+        if self._folded_version != version:
+            with torch.no_grad():
+                scale = self._output_scale
+                self._folded_fc = (self.fc.weight * scale[:, None], self.fc.bias * scale)
+            self._folded_version = version
+        return self._folded_fc
 
 
 class ShortTermForecaster:
@@ -48,37 +111,78 @@ class ShortTermForecaster:
     Uses LSTM to predict next-step values
     """
     
-    def __init__(self, sequence_length: int = 10):
+    # Feature dimensions: time, solar, wind, load, cloud, wind_speed, temp
+    INPUT_DIM = 7
+    # Observations kept for prediction and online retraining
+    HISTORY_CAPACITY = 1000
+    
+    def __init__(self, sequence_length: int = 10, model: Optional[LSTMForecaster] = None,
+                 quantize: bool = False, trace: bool = False):
+        """
+        Args:
+            sequence_length: Observations fed to the LSTM per prediction
+            model: Existing LSTM to predict with (e.g. one shared across
+                sessions); a fresh one is created when omitted
+            quantize: After train(), predict with a dynamically quantized
+                int8 copy of the LSTM (training keeps the fp32 weights)
+            trace: After train(), run one-step predictions through a frozen
+                TorchScript graph specialized to the (1, sequence_length,
+                INPUT_DIM) input
+        """
         self.sequence_length = sequence_length
         
-        # Feature dimensions: time, solar, wind, load, cloud, wind_speed, temp
-        self.input_dim = 7
+        self.input_dim = self.INPUT_DIM
         
         # LSTM model
-        self.model = LSTMForecaster(self.input_dim)
+        self.model = model if model is not None else LSTMForecaster(self.input_dim)
+        self.model.eval()  # only train() switches to training mode
         self.optimizer = torch.optim.Adam(self.model.parameters(), lr=1e-3)
+        self.loss_fn = nn.MSELoss()
         
-        # Data buffer
-        self.history = deque(maxlen=1000)
+        # Model used for predictions; an int8 copy after train() if quantizing
+        self.quantize = quantize
+        self.inference_model = self.model
+        
+        # Traced forward_kw of the inference model, rebuilt by train()
+        self.trace = trace
+        self._traced_forward_kw = None
+        
+        # Normalized observations in a mirrored float32 ring: every slot is
+        # written twice (i and i + capacity) so the latest rows are always
+        # one contiguous slice
+        self._buffer = np.zeros((2 * self.HISTORY_CAPACITY, self.input_dim), dtype=np.float32)
+        self._count = 0
         
         # Training flag
         self.is_trained = False
+        
+        # One-step forecast for the current history (cleared on update)
+        self._cached_forecast: Optional[Tuple[float, float, float]] = None
     
     def update_history(self, time_of_day: float, solar: float, wind: float, 
                        load: float, cloud_cover: float, wind_speed: float, 
                        temperature: float):
         """Add new observation to history"""
-        observation = np.array([
-            time_of_day / 24.0,  # Normalize
-            solar / 500.0,
-            wind / 300.0,
-            load / 1000.0,
-            cloud_cover,
-            wind_speed / 25.0,
-            temperature / 50.0
-        ])
-        
-        self.history.append(observation)
+        _write_observation(
+            self._buffer, self._count % self.HISTORY_CAPACITY, self.HISTORY_CAPACITY,
+            time_of_day, solar, wind, load, cloud_cover, wind_speed, temperature
+        )
+        self._count += 1
+        self._cached_forecast = None
+    
+    @property
+    def has_forecast(self) -> bool:
+        """True once there is a full LSTM input sequence to predict from"""
+        return self._count >= self.sequence_length
+    
+    @property
+    def history(self) -> np.ndarray:
+        """Normalized observations in chronological order (a view, no copy)"""
+        if self._count == 0:
+            return self._buffer[:0]
+        n = min(self._count, self.HISTORY_CAPACITY)
+        end = (self._count - 1) % self.HISTORY_CAPACITY + self.HISTORY_CAPACITY + 1
+        return self._buffer[end - n:end]
     
     def predict(self, horizon: int = 1) -> Tuple[float, float, float]:
         """
@@ -102,21 +206,19 @@ class ShortTermForecaster:
             else:
                 return (0.0, 0.0, 400.0)
         
-        # Prepare input sequence
-        sequence = np.array(list(self.history)[-self.sequence_length:])
-        sequence_tensor = torch.FloatTensor(sequence).unsqueeze(0)
+        # Same history as the last call: reuse its LSTM output
+        if horizon == 1 and self._cached_forecast is not None:
+            return self._cached_forecast
         
-        # Predict
-        with torch.no_grad():
-            self.model.eval()
-            prediction = self.model(sequence_tensor).numpy()[0]
+        # Prepare input sequence (contiguous float32 view of the ring)
+        sequence = self.history[-self.sequence_length:]
+        sequence_tensor = torch.from_numpy(sequence).unsqueeze(0)
         
-        # De-normalize
-        solar_pred = prediction[0] * 500.0
-        wind_pred = prediction[1] * 300.0
-        load_pred = prediction[2] * 1000.0
+        # Predict
+        solar_pred, wind_pred, load_pred = self._forward_kw(sequence_tensor)[0].tolist()
         
-        return (solar_pred, wind_pred, load_pred)
+        self._cached_forecast = (solar_pred, wind_pred, load_pred)
+        return self._cached_forecast
     
     def train(self, epochs: int = 50):
         """
@@ -132,18 +234,18 @@ class ShortTermForecaster:
         if len(self.history) < self.sequence_length + 10:
             return
         
-        # Prepare training data
-        X, y = [], []
-        
-        history_array = np.array(list(self.history))
+        # Prepare training data: every full window predicts the next step's
+        # solar, wind and load
+        history_array = self.history
+        n_samples = len(history_array) - self.sequence_length - 1
         
-        for i in range(len(history_array) - self.sequence_length - 1):
-            X.append(history_array[i:i+self.sequence_length])
-            # Target: next step's solar, wind, load
-            y.append(history_array[i+self.sequence_length, [1, 2, 3]])
-        
-        X = torch.FloatTensor(np.array(X))
-        y = torch.FloatTensor(np.array(y))
+        windows = np.lib.stride_tricks.sliding_window_view(
+            history_array, self.sequence_length, axis=0
+        )  # (n, features, sequence) view, no copy
+        X = torch.from_numpy(np.ascontiguousarray(windows[:n_samples].transpose(0, 2, 1)))
+        y = torch.from_numpy(np.ascontiguousarray(
+            history_array[self.sequence_length:self.sequence_length + n_samples, 1:4]
+        ))
         
         # Training loop
         self.model.train()
@@ -151,67 +253,94 @@ class ShortTermForecaster:
         for epoch in range(epochs):
             # Forward pass
             predictions = self.model(X)
-            loss = nn.MSELoss()(predictions, y)
+            loss = self.loss_fn(predictions, y)
             
             # Backward pass
-            self.optimizer.zero_grad()
+            self.optimizer.zero_grad(set_to_none=True)
             loss.backward()
             self.optimizer.step()
         
+        # Back to inference mode; predict() relies on it staying set
+        self.model.eval()
+        
+        if self.quantize:
+            self.inference_model = self._quantized_copy()
+        if self.trace:
+            self._traced_forward_kw = self._traced_copy()
+        
         self.is_trained = True
+        self._cached_forecast = None
+    
+    def _quantized_copy(self) -> nn.Module:
+        """Dynamic int8 copy of the LSTM layers for CPU inference"""
+        model = copy.deepcopy(self.model)
+        with warnings.catch_warnings():
+            # torch.ao.quantization is deprecated in favour of torchao
+            warnings.simplefilter('ignore')
+            return torch.ao.quantization.quantize_dynamic(model, {nn.LSTM}, dtype=torch.qint8)
+    
+    def _traced_copy(self):
+        """forward_kw of the inference model, traced for the fixed input shape and frozen"""
+        model = self.inference_model
+        model.folded_fc()  # warm the cache so the scaled fc is traced as constants
+        example = torch.zeros(1, self.sequence_length, self.input_dim)
+        with warnings.catch_warnings(), torch.no_grad():
+            # TorchScript is deprecated in favour of torch.export
+            warnings.simplefilter('ignore')
+            traced = torch.jit.trace_module(model, {'forward_kw': example})
+            frozen = torch.jit.freeze(traced, preserved_attrs=['forward_kw'])
+            return torch.jit.optimize_for_inference(frozen, other_methods=['forward_kw']).forward_kw
+    
+    @torch.inference_mode()
+    def _forward_kw(self, sequence_tensor: torch.Tensor) -> torch.Tensor:
+        """LSTM forecast in kW, without autograd (model is kept in eval mode)"""
+        if self._traced_forward_kw is not None:
+            return self._traced_forward_kw(sequence_tensor)
+        return self.inference_model.forward_kw(sequence_tensor)
     
     def get_forecast_horizon(self, steps: int = 6) -> List[Tuple[float, float, float]]:
         """
         Get multi-step forecast
         
+        The LSTM runs once over the current sequence, then each predicted
+        step is fed back as a single new time step, carrying the hidden
+        state instead of re-encoding a shifted window every step.
+        
         Args:
             steps: Number of steps to forecast
         
         Returns:
             List of (solar, wind, load) predictions
         """
-        forecasts = []
-        
-        # Use current history
-        current_sequence = list(self.history)[-self.sequence_length:]
+        if steps <= 0 or not self.has_forecast:
+            return []
         
-        for _ in range(steps):
-            if len(current_sequence) < self.sequence_length:
+        sequence_tensor = torch.from_numpy(self.history[-self.sequence_length:]).unsqueeze(0)
+        return [tuple(row) for row in self._rollout_kw(sequence_tensor, steps).tolist()]
+    
+    @torch.inference_mode()
+    def _rollout_kw(self, sequence_tensor: torch.Tensor, steps: int) -> torch.Tensor:
+        """Autoregressive (steps, 3) forecast in kW"""
+        model = self.inference_model
+        weight, bias = model.folded_fc()
+        scale = model._output_scale
+        
+        forecasts = torch.empty(steps, 3)
+        
+        # Next observation: cloud cover, wind speed and temperature are
+        # assumed to stay the same, so they are copied once
+        step_input = sequence_tensor[:, -1:, :].clone()
+        
+        lstm_out, hidden = model.lstm(sequence_tensor)
+        for k in range(steps):
+            forecasts[k] = nn.functional.linear(lstm_out[0, -1], weight, bias)
+            if k == steps - 1:
                 break
             
-            # Predict next step
-            sequence_tensor = torch.FloatTensor(np.array(current_sequence)).unsqueeze(0)
-            
-            with torch.no_grad():
-                self.model.eval()
-                prediction = self.model(sequence_tensor).numpy()[0]
-            
-            # De-normalize
-            solar_pred = prediction[0] * 500.0
-            wind_pred = prediction[1] * 300.0
-            load_pred = prediction[2] * 1000.0
-            
-            forecasts.append((solar_pred, wind_pred, load_pred))
-            
-            # Update sequence for next prediction
-            # Assume time advances by 0.1 hours
-            last_time = current_sequence[-1][0]
-            next_time = (last_time + 0.1 / 24.0) % 1.0
-            
-            # Create next observation (with predictions)
-            next_obs = np.array([
-                next_time,
-                prediction[0],
-                prediction[1],
-                prediction[2],
-                current_sequence[-1][4],  # Assume cloud cover stays same
-                current_sequence[-1][5],  # Assume wind speed stays same
-                current_sequence[-1][6]   # Assume temperature stays same
-            ])
-            
-            # Shift sequence
-            current_sequence.append(next_obs)
-            current_sequence = current_sequence[-self.sequence_length:]
+            # Time advances by 0.1 hours; predictions go back in normalized
+            step_input[0, 0, 0] = (step_input[0, 0, 0] + 0.1 / 24.0) % 1.0
+            step_input[0, 0, 1:4] = forecasts[k] / scale
+            lstm_out, hidden = model.lstm(step_input, hidden)
         
         return forecasts
 
@@ -222,54 +351,68 @@ class NaiveForecaster:
     For comparison with LSTM
     """
     
+    # Observations kept (oldest overwritten first)
+    CAPACITY = 100
+    
     def __init__(self):
-        self.history = deque(maxlen=100)
+        # Parallel ring buffer columns
+        self.time = np.zeros(self.CAPACITY)
+        self.solar = np.zeros(self.CAPACITY)
+        self.wind = np.zeros(self.CAPACITY)
+        self.load = np.zeros(self.CAPACITY)
+        self._count = 0
+    
+    def __len__(self) -> int:
+        return min(self._count, self.CAPACITY)
     
     def update_history(self, time_of_day: float, solar: float, wind: float, load: float):
         """Add observation"""
-        self.history.append({
-            'time': time_of_day,
-            'solar': solar,
-            'wind': wind,
-            'load': load
-        })
+        i = self._count % self.CAPACITY
+        self.time[i] = time_of_day
+        self.solar[i] = solar
+        self.wind[i] = wind
+        self.load[i] = load
+        self._count += 1
+    
+    @property
+    def last_time(self) -> Optional[float]:
+        """Time of day of the latest observation, or None when empty"""
+        if self._count == 0:
+            return None
+        return float(self.time[(self._count - 1) % self.CAPACITY])
     
     def predict(self) -> Tuple[float, float, float]:
         """Predict using persistence (last value)"""
-        if len(self.history) == 0:
+        if self._count == 0:
             return (0.0, 0.0, 400.0)
         
-        last = self.history[-1]
-        return (last['solar'], last['wind'], last['load'])
+        i = (self._count - 1) % self.CAPACITY
+        return (float(self.solar[i]), float(self.wind[i]), float(self.load[i]))
     
     def predict_moving_average(self, window: int = 5) -> Tuple[float, float, float]:
         """Predict using moving average"""
-        if len(self.history) < window:
+        if len(self) < window:
             return self.predict()
         
-        recent = list(self.history)[-window:]
+        # Slots of the last `window` observations, wrapping around the ring
+        recent = np.arange(self._count - window, self._count) % self.CAPACITY
         
-        solar_avg = np.mean([obs['solar'] for obs in recent])
-        wind_avg = np.mean([obs['wind'] for obs in recent])
-        load_avg = np.mean([obs['load'] for obs in recent])
-        
-        return (solar_avg, wind_avg, load_avg)
+        return (
+            float(self.solar[recent].mean()),
+            float(self.wind[recent].mean()),
+            float(self.load[recent].mean())
+        )
     
     def predict_seasonal(self, time_of_day: float) -> Tuple[float, float, float]:
         """Predict using seasonal patterns"""
-        # Find similar times of day in history
-        similar_times = [
-            obs for obs in self.history
-            if abs(obs['time'] - time_of_day) < 1.0  # Within 1 hour
-        ]
+        # Average observations at similar times of day (within 1 hour)
+        solar_avg, wind_avg, load_avg, count = _seasonal_mean(
+            self.time, self.solar, self.wind, self.load, time_of_day, len(self)
+        )
         
-        if len(similar_times) == 0:
+        if count == 0:
             return self.predict()
         
-        solar_avg = np.mean([obs['solar'] for obs in similar_times])
-        wind_avg = np.mean([obs['wind'] for obs in similar_times])
-        load_avg = np.mean([obs['load'] for obs in similar_times])
-        
         return (solar_avg, wind_avg, load_avg)
 
 
@@ -279,42 +422,47 @@ class WeatherPredictor:
     Predicts cloud cover and wind speed
     """
     
+    # AR(1) trend weight and pull toward the long-run mean
+    TREND = 0.3
+    REVERSION = 0.1
+    
     def __init__(self):
-        self.cloud_history = deque(maxlen=50)
-        self.wind_history = deque(maxlen=50)
+        # The AR(1) model only needs the last two observations
+        self.cloud_last = self.cloud_prev = 0.0
+        self.wind_last = self.wind_prev = 0.0
+        self.observations = 0
     
     def update(self, cloud_cover: float, wind_speed: float):
         """Update with new observation"""
-        self.cloud_history.append(cloud_cover)
-        self.wind_history.append(wind_speed)
+        self.cloud_prev, self.cloud_last = self.cloud_last, cloud_cover
+        self.wind_prev, self.wind_last = self.wind_last, wind_speed
+        self.observations += 1
+    
+    @classmethod
+    def _ar_predict(cls, last: float, prev: float, mean: float, upper: float) -> float:
+        """
+        Trend-following step with mean reversion, clipped to [0, upper]
+        
+        last + TREND * (last - prev) + REVERSION * (mean - last), folded
+        into a single multiply-add chain.
+        """
+        prediction = ((1.0 + cls.TREND - cls.REVERSION) * last
+                      - cls.TREND * prev + cls.REVERSION * mean)
+        return min(max(prediction, 0.0), upper)
     
     def predict_cloud(self) -> float:
         """Predict next cloud cover value"""
-        if len(self.cloud_history) < 2:
+        if self.observations < 2:
             return 0.3  # Default
         
-        # Simple auto-regressive model
-        last_value = self.cloud_history[-1]
-        trend = self.cloud_history[-1] - self.cloud_history[-2]
-        
-        # Predict with mean reversion
-        prediction = last_value + 0.3 * trend + 0.1 * (0.3 - last_value)
-        
-        return np.clip(prediction, 0, 1)
+        return self._ar_predict(self.cloud_last, self.cloud_prev, 0.3, 1.0)
     
     def predict_wind(self) -> float:
         """Predict next wind speed"""
-        if len(self.wind_history) < 2:
+        if self.observations < 2:
             return 10.0  # Default
         
-        # Simple auto-regressive model
-        last_value = self.wind_history[-1]
-        trend = self.wind_history[-1] - self.wind_history[-2]
-        
-        # Predict with mean reversion
-        prediction = last_value + 0.3 * trend + 0.1 * (10.0 - last_value)
-        
-        return np.clip(prediction, 0, 25)
+        return self._ar_predict(self.wind_last, self.wind_prev, 10.0, 25.0)
 
 
 class EnsembleForecaster:
@@ -347,35 +495,23 @@ class EnsembleForecaster:
     
     def predict(self) -> Tuple[float, float, float]:
         """Ensemble prediction"""
-        # LSTM prediction
-        lstm_pred = self.lstm_forecaster.predict()
-        
-        # Naive prediction
-        naive_pred = self.naive_forecaster.predict()
-        
-        # Seasonal prediction
-        time = self.naive_forecaster.history[-1]['time'] if self.naive_forecaster.history else 12.0
-        seasonal_pred = self.naive_forecaster.predict_seasonal(time)
-        
-        # Weighted average
-        solar = (
-            self.weights['lstm'] * lstm_pred[0] +
-            self.weights['naive'] * naive_pred[0] +
-            self.weights['seasonal'] * seasonal_pred[0]
-        )
-        
-        wind = (
-            self.weights['lstm'] * lstm_pred[1] +
-            self.weights['naive'] * naive_pred[1] +
-            self.weights['seasonal'] * seasonal_pred[1]
-        )
-        
-        load = (
-            self.weights['lstm'] * lstm_pred[2] +
-            self.weights['naive'] * naive_pred[2] +
-            self.weights['seasonal'] * seasonal_pred[2]
-        )
-        
+        weights = np.array([self.weights['lstm'], self.weights['naive'], self.weights['seasonal']])
+        
+        # LSTM and naive predictions; seasonal only when it carries weight
+        predictions = np.empty((3, 3))
+        predictions[0] = self.lstm_forecaster.predict()
+        predictions[1] = self.naive_forecaster.predict()
+        
+        if weights[2] != 0.0:
+            time = self.naive_forecaster.last_time
+            if time is None:
+                time = 12.0
+            predictions[2] = self.naive_forecaster.predict_seasonal(time)
+        else:
+            predictions[2] = 0.0
+        
+        # Weighted average of the (method x [solar, wind, load]) rows
+        solar, wind, load = (weights @ predictions).tolist()
         return (solar, wind, load)
     
     def train_lstm(self):
@@ -3,44 +3,433 @@ Grid Simulator - Realistic Microgrid Physics and State Management
 Simulates solar, wind, battery, load dynamics with event injection
 """
 
+import math
 import numpy as np
-from dataclasses import dataclass
+from numba import njit, prange
 from typing import Tuple, Optional
 import random
 
-@dataclass
+# GridState fields, in the order of GridState.values
+(_SOLAR, _WIND, _LOAD, _SOC, _CAPACITY, _CHARGE_RATE, _HEALTH, _IMPORT, _FREQUENCY,
+ _VOLTAGE, _STABILITY, _COST, _CLOUD, _WIND_SPEED, _TEMPERATURE, _TIME, _DAY) = range(17)
+
+
+def _field(index: int) -> property:
+    """Float property over one slot of GridState.values"""
+    def get(self):
+        return self.values.item(index)
+    
+    def set(self, value):
+        self.values[index] = value
+    
+    return property(get, set)
+
+
 class GridState:
-    """Complete grid state representation"""
+    """
+    Complete grid state representation
+    
+    Every field lives in one float64 array, `values`, so the compiled step
+    kernel updates the state in place; the attributes are views of its slots.
+    """
+    
+    __slots__ = ('values',)
+    
+    # Field names and defaults, in array order
+    FIELDS = (
+        'solar_generation', 'wind_generation', 'load_demand',
+        'battery_soc', 'battery_capacity', 'battery_charge_rate', 'battery_health',
+        'grid_import', 'grid_frequency', 'grid_voltage',
+        'stability_score', 'energy_cost',
+        'cloud_cover', 'wind_speed', 'temperature',
+        'time_of_day', 'day_of_year',
+    )
+    DEFAULTS = (
+        0.0, 0.0, 0.0,
+        0.5, 1000.0, 0.0, 1.0,
+        0.0, 50.0, 1.0,
+        1.0, 0.0,
+        0.0, 0.0, 25.0,
+        12.0, 1,
+    )
+    
     # Generation
-    solar_generation: float = 0.0  # kW
-    wind_generation: float = 0.0   # kW
+    solar_generation = _field(_SOLAR)          # kW
+    wind_generation = _field(_WIND)            # kW
     
     # Load
-    load_demand: float = 0.0       # kW
+    load_demand = _field(_LOAD)                # kW
     
     # Battery
-    battery_soc: float = 0.5       # 0-1
-    battery_capacity: float = 1000.0  # kWh
-    battery_charge_rate: float = 0.0   # kW
-    battery_health: float = 1.0    # 0-1
+    battery_soc = _field(_SOC)                 # 0-1
+    battery_capacity = _field(_CAPACITY)       # kWh
+    battery_charge_rate = _field(_CHARGE_RATE) # kW
+    battery_health = _field(_HEALTH)           # 0-1
     
     # Grid
-    grid_import: float = 0.0       # kW (positive = import, negative = export)
-    grid_frequency: float = 50.0   # Hz
-    grid_voltage: float = 1.0      # pu (per unit)
+    grid_import = _field(_IMPORT)              # kW (positive = import, negative = export)
+    grid_frequency = _field(_FREQUENCY)        # Hz
+    grid_voltage = _field(_VOLTAGE)            # pu (per unit)
     
     # Metrics
-    stability_score: float = 1.0   # 0-1
-    energy_cost: float = 0.0       # INR
+    stability_score = _field(_STABILITY)       # 0-1
+    energy_cost = _field(_COST)                # INR
     
     # Weather
-    cloud_cover: float = 0.0       # 0-1
-    wind_speed: float = 0.0        # m/s
-    temperature: float = 25.0      # Celsius
+    cloud_cover = _field(_CLOUD)               # 0-1
+    wind_speed = _field(_WIND_SPEED)           # m/s
+    temperature = _field(_TEMPERATURE)         # Celsius
     
     # Time
-    time_of_day: float = 12.0      # 0-24 hours
-    day_of_year: int = 1           # 1-365
+    time_of_day = _field(_TIME)                # 0-24 hours
+    
+    @property
+    def day_of_year(self) -> int:
+        """Day of the year, 1-365"""
+        return int(self.values[_DAY])
+    
+    @day_of_year.setter
+    def day_of_year(self, value: int):
+        self.values[_DAY] = value
+    
+    def __init__(self, **fields):
+        self.values = np.array(self.DEFAULTS, dtype=np.float64)
+        for name, value in fields.items():
+            setattr(self, name, value)
+    
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.FIELDS)
+        return f'GridState({fields})'
+
+
+# ============================================================================
+# Compiled Physics Kernels
+# ============================================================================
+
+# Simulator parameters, in the order of MicrogridDigitalTwin.params
+(_DT, _SOLAR_CAPACITY, _WIND_CAPACITY, _MAX_CHARGE_RATE, _EFFICIENCY, _IMPORT_COST,
+ _EXPORT_PRICE, _DEGRADATION_COST, _FREQUENCY_NOMINAL, _VOLTAGE_NOMINAL) = range(10)
+
+# Slots of MicrogridDigitalTwin.reward_weights
+(REWARD_STABILITY, REWARD_RENEWABLE, REWARD_BATTERY_HEALTH, REWARD_SOC_PENALTY,
+ REWARD_INSTABILITY_PENALTY) = range(5)
+
+# Slots of MicrogridDigitalTwin.safety_violations
+FREQUENCY_VIOLATIONS, VOLTAGE_VIOLATIONS, SOC_VIOLATIONS, TOTAL_VIOLATIONS = range(4)
+
+
+@njit(cache=True, fastmath=True)
+def _solar_output(time_of_day, day_of_year, cloud_cover, temperature, capacity):
+    """Solar PV output (kW) for the time of day, season, clouds and panel temperature"""
+    # Daylight hours (6 AM to 6 PM)
+    if not 6.0 <= time_of_day <= 18.0:
+        return 0.0
+    
+    # Peak at noon
+    hour_angle = (time_of_day - 12.0) * math.pi / 12.0
+    base_irradiance = max(0.0, math.cos(hour_angle))
+    
+    # Cloud impact
+    cloud_factor = 1.0 - 0.8 * cloud_cover
+    
+    # Seasonal variation
+    seasonal_factor = 1.0 + 0.2 * math.sin(2.0 * math.pi * day_of_year / 365.0)
+    
+    # Temperature derating (solar panels lose efficiency at high temp)
+    temp_factor = 1.0 - 0.004 * max(0.0, temperature - 25.0)
+    
+    return capacity * base_irradiance * cloud_factor * seasonal_factor * temp_factor
+
+
+@njit(cache=True, fastmath=True)
+def _wind_output(wind_speed, capacity):
+    """Wind turbine output (kW) from a simplified power curve"""
+    # Zero below the 3 m/s cut-in, linear up to rated power at 12 m/s, and
+    # zero again from the 25 m/s cut-out; written branch-free so batched
+    # steps compile to min/max/select instead of a compare ladder
+    power = min(max((wind_speed - 3.0) / 9.0, 0.0), 1.0)
+    cut_out = 0.0 if wind_speed >= 25.0 else 1.0
+    
+    return capacity * power * cut_out
+
+
+@njit(cache=True, fastmath=True)
+def _load_output(hour, day_of_year, noise):
+    """Load demand (kW) from the daily profile, scaled by a standard normal draw"""
+    # Morning peak (7-9 AM)
+    morning_peak = 0.3 * math.exp(-((hour - 8.0) ** 2) / 2.0)
+    
+    # Evening peak (6-10 PM)
+    evening_peak = 0.5 * math.exp(-((hour - 20.0) ** 2) / 4.0)
+    
+    # Base load
+    base_load = 0.4
+    
+    # Weekend/weekday difference
+    weekday = int(day_of_year) % 7
+    day_type_factor = 0.9 if weekday == 0 or weekday == 6 else 1.0
+    
+    # Random variation (10% standard deviation)
+    random_factor = 1.0 + 0.1 * noise
+    
+    load_factor = (base_load + morning_peak + evening_peak) * day_type_factor * random_factor
+    
+    # Total load (assuming 800 kW peak)
+    return 800.0 * min(max(load_factor, 0.3), 1.0)
+
+
+@njit(cache=True, fastmath=True)
+def _stability(frequency, voltage, battery_health, battery_soc, solar, wind,
+               charge_rate, grid_import, load):
+    """
+    Grid stability score (0-1) and which safety limits were violated
+    
+    Returns:
+        (score, frequency_violation, voltage_violation, soc_violation)
+    """
+    # Frequency stability (±1 Hz tolerance, violation beyond ±0.5 Hz)
+    freq_deviation = abs(frequency - 50.0)
+    freq_score = max(0.0, 1.0 - freq_deviation / 1.0)
+    
+    # Voltage stability (±0.1 pu tolerance, violation beyond ±0.05 pu)
+    volt_deviation = abs(voltage - 1.0)
+    volt_score = max(0.0, 1.0 - volt_deviation / 0.1)
+    
+    # Supply-demand balance
+    total_generation = solar + wind + abs(charge_rate) + max(0.0, grid_import)
+    balance_ratio = min(total_generation / max(load, 1.0), 1.0)
+    
+    # Combined stability score
+    score = 0.3 * freq_score + 0.3 * volt_score + 0.2 * battery_health + 0.2 * balance_ratio
+    
+    return (score, freq_deviation > 0.5, volt_deviation > 0.05,
+            battery_soc < 0.1 or battery_soc > 0.95)
+
+
+@njit(cache=True)
+def _count_violations(violations, frequency, voltage, soc):
+    """Add one step's safety limit violations to a safety_violations array"""
+    violations[FREQUENCY_VIOLATIONS] += frequency
+    violations[VOLTAGE_VIOLATIONS] += voltage
+    violations[SOC_VIOLATIONS] += soc
+    violations[TOTAL_VIOLATIONS] += frequency + voltage + soc
+
+
+@njit(cache=True, fastmath=True)
+def _energy_cost(grid_import, charge_rate, dt, import_cost, export_price, degradation_cost):
+    """Step energy cost in INR: imports and battery wear, less export revenue"""
+    import_cost = max(0.0, grid_import) * import_cost * dt
+    export_revenue = max(0.0, -grid_import) * export_price * dt
+    battery_cost = abs(charge_rate) * degradation_cost * dt
+    return import_cost - export_revenue + battery_cost
+
+
+@njit(cache=True, fastmath=True)
+def _write_state_vector(s, solar_capacity, wind_capacity, out):
+    """Reactive-mode state vector of a GridState.values array (see get_state_vector)"""
+    out[0] = s[_SOLAR] / solar_capacity
+    out[1] = s[_WIND] / wind_capacity
+    out[2] = s[_LOAD] / 1000.0
+    out[3] = s[_SOC]
+    out[4] = s[_HEALTH]
+    out[5] = s[_IMPORT] / 1000.0
+    out[6] = (s[_FREQUENCY] - 50.0) / 2.0
+    out[7] = s[_VOLTAGE] - 1.0
+    out[8] = s[_CLOUD]
+    out[9] = s[_WIND_SPEED] / 25.0
+    
+    # No forecast: the predicted values repeat the current ones
+    out[10] = out[0]
+    out[11] = out[1]
+    out[12] = out[2]
+
+
+@njit(cache=True)
+def _write_state_vectors(states, p, out):
+    """Reactive-mode state vectors of every row of a batch state array"""
+    for i in range(states.shape[0]):
+        _write_state_vector(states[i], p[_SOLAR_CAPACITY], p[_WIND_CAPACITY], out[i])
+
+
+# Explicit signature: compiled (or loaded from the cache) once at import,
+# and calls skip Numba's per-call type dispatch
+@njit('Tuple((float64, boolean))(float64[::1], float64[::1], float64[::1], float64[::1], '
+      'float64[::1], int64[::1], int64, float32[::1])', cache=True, fastmath=True)
+def _step_kernel(s, action, noise, p, weights, violations, time_step, state_vector):
+    """
+    Advance the grid physics by one step, in place
+    
+    Args:
+        s: GridState.values array
+        action: 5 control commands (clipped to 0-1 here)
+        noise: 4 standard normal draws for cloud, wind, temperature and load
+        p: MicrogridDigitalTwin.params array
+        weights: reward_weights array
+        violations: safety_violations array, updated here
+        time_step: Step count after this step, for the episode length limit
+        state_vector: 13-element float32 output for the next state vector
+    
+    Returns:
+        (reward, done)
+    """
+    dt = p[_DT]
+    
+    # Parse action
+    battery_charge_cmd = min(max(action[0], 0.0), 1.0)
+    battery_discharge_cmd = min(max(action[1], 0.0), 1.0)
+    load_shift_cmd = min(max(action[2], 0.0), 1.0)
+    grid_import_cmd = min(max(action[3], 0.0), 1.0)
+    curtailment_cmd = min(max(action[4], 0.0), 1.0)
+    
+    # Update time
+    s[_TIME] = (s[_TIME] + dt) % 24.0
+    
+    # Weather: cloud cover random walk with a tendency to clear, wind speed
+    # random walk, temperature on a daily cycle
+    s[_CLOUD] = min(max(s[_CLOUD] + 0.05 * noise[0] - 0.01, 0.0), 1.0)
+    s[_WIND_SPEED] = min(max(s[_WIND_SPEED] + 1.0 * noise[1], 0.0), 25.0)
+    hour_angle = (s[_TIME] - 14.0) * math.pi / 12.0
+    s[_TEMPERATURE] = 27.0 + 8.0 * math.cos(hour_angle) + noise[2]
+    
+    # Generation and load
+    s[_SOLAR] = _solar_output(s[_TIME], s[_DAY], s[_CLOUD], s[_TEMPERATURE], p[_SOLAR_CAPACITY])
+    s[_WIND] = _wind_output(s[_WIND_SPEED], p[_WIND_CAPACITY])
+    s[_LOAD] = _load_output(s[_TIME], s[_DAY], noise[3])
+    
+    # Calculate available renewable energy, after curtailment
+    available_renewable = s[_SOLAR] + s[_WIND]
+    curtailed_renewable = available_renewable * (1.0 - curtailment_cmd * 0.5)
+    
+    # Apply load shifting (reduce load temporarily)
+    shifted_load = s[_LOAD] * (1.0 - load_shift_cmd * 0.2)
+    
+    # Battery operations
+    battery_power = 0.0
+    soc = s[_SOC]
+    capacity = s[_CAPACITY]
+    
+    if battery_charge_cmd > 0.5 and soc < 0.95:
+        # Charge battery from excess renewable
+        excess_renewable = max(0.0, curtailed_renewable - shifted_load)
+        charge_power = min(
+            excess_renewable,
+            battery_charge_cmd * p[_MAX_CHARGE_RATE],
+            (0.95 - soc) * capacity / dt
+        )
+        battery_power = -charge_power  # Negative = charging
+        
+    elif battery_discharge_cmd > 0.5 and soc > 0.1:
+        # Discharge battery to meet load
+        deficit = max(0.0, shifted_load - curtailed_renewable)
+        discharge_power = min(
+            deficit,
+            battery_discharge_cmd * p[_MAX_CHARGE_RATE],
+            (soc - 0.1) * capacity / dt
+        )
+        battery_power = discharge_power  # Positive = discharging
+    
+    # Update battery SOC
+    energy_change = battery_power * dt
+    if battery_power < 0:  # Charging
+        energy_change *= p[_EFFICIENCY]
+    else:  # Discharging
+        energy_change /= p[_EFFICIENCY]
+    
+    s[_SOC] = min(max(soc - energy_change / capacity, 0.0), 1.0)
+    s[_CHARGE_RATE] = battery_power
+    
+    # Battery degradation
+    s[_HEALTH] *= 0.9999  # Slow degradation
+    
+    # Calculate grid import/export
+    grid_balance = shifted_load - curtailed_renewable - battery_power
+    
+    # Grid import control
+    if grid_import_cmd > 0.5:
+        s[_IMPORT] = grid_balance
+    else:
+        s[_IMPORT] = max(0.0, grid_balance)  # No export
+    
+    # Grid dynamics: a deficit (positive imbalance) drops the frequency,
+    # and any imbalance sags the voltage (simplified reactive power)
+    s[_FREQUENCY] = min(max(p[_FREQUENCY_NOMINAL] - grid_balance / 1000.0, 49.0), 51.0)
+    s[_VOLTAGE] = min(max(p[_VOLTAGE_NOMINAL] - abs(grid_balance) / 2000.0, 0.9), 1.1)
+    
+    # Stability, cost and reward
+    stability, freq_violation, volt_violation, soc_violation = _stability(
+        s[_FREQUENCY], s[_VOLTAGE], s[_HEALTH], s[_SOC], s[_SOLAR], s[_WIND],
+        s[_CHARGE_RATE], s[_IMPORT], s[_LOAD]
+    )
+    s[_STABILITY] = stability
+    _count_violations(violations, freq_violation, volt_violation, soc_violation)
+    s[_COST] = _energy_cost(s[_IMPORT], s[_CHARGE_RATE], dt, p[_IMPORT_COST],
+                            p[_EXPORT_PRICE], p[_DEGRADATION_COST])
+    
+    # Stability reward (most important), cost penalty, renewable
+    # utilization and battery health bonuses
+    renewable_ratio = min(available_renewable / max(s[_LOAD], 1.0), 1.0)
+    reward = (
+        weights[REWARD_STABILITY] * stability
+        - s[_COST]
+        + weights[REWARD_RENEWABLE] * renewable_ratio
+        + weights[REWARD_BATTERY_HEALTH] * s[_HEALTH]
+    )
+    
+    # Penalty for extreme battery SOC
+    if s[_SOC] < 0.15 or s[_SOC] > 0.95:
+        reward += weights[REWARD_SOC_PENALTY]
+    
+    # Penalty for grid instability
+    if stability < 0.7:
+        reward += weights[REWARD_INSTABILITY_PENALTY]
+    
+    # Terminate on severe instability, battery failure, excessive frequency
+    # deviation, or after a long episode
+    done = (
+        stability < 0.5
+        or s[_HEALTH] < 0.5
+        or abs(s[_FREQUENCY] - 50.0) > 2.0
+        or time_step > 1000
+    )
+    
+    _write_state_vector(s, p[_SOLAR_CAPACITY], p[_WIND_CAPACITY], state_vector)
+    
+    return reward, done
+
+
+@njit(cache=True, fastmath=True, parallel=True, nogil=True)
+def _step_batch(states, actions, noise, p, weights, time_steps, state_vectors, rewards,
+                dones, violations):
+    """
+    Advance every environment of a batch by one step, in parallel
+    
+    Args:
+        states: (N, len(GridState.FIELDS)) state arrays, one row per environment
+        actions: (N, 5) control commands
+        noise: (N, 4) standard normal draws
+        p, weights: Shared parameter and reward weight arrays
+        time_steps: (N,) step counters, incremented here
+        state_vectors: (N, 13) float32 output
+        rewards, dones: (N,) outputs
+        violations: (N, 4) safety_violations counters
+    """
+    for i in prange(states.shape[0]):
+        time_steps[i] += 1
+        rewards[i], dones[i] = _step_kernel(
+            states[i], actions[i], noise[i], p, weights, violations[i], time_steps[i],
+            state_vectors[i]
+        )
+
+
+def _param(index: int) -> property:
+    """Float property over one slot of MicrogridDigitalTwin.params"""
+    def get(self):
+        return self.params.item(index)
+    
+    def set(self, value):
+        self.params[index] = value
+    
+    return property(get, set)
 
 
 class MicrogridDigitalTwin:
@@ -58,6 +447,27 @@ class MicrogridDigitalTwin:
     and demonstration platform for autonomous grid management.
     """
     
+    # Standard normal draws fetched from NumPy at a time (4 used per step)
+    NOISE_BLOCK = 4096
+    
+    # Stress test events: bit k of the event mask and slot k of the
+    # countdown array belong to EVENTS[k]
+    EVENTS = ('cloud_cover', 'wind_drop', 'peak_demand', 'battery_degradation')
+    EVENT_DURATIONS = np.array([10, 15, 20, 5], dtype=np.int32)  # steps
+    _EVENT_BITS = 1 << np.arange(4, dtype=np.int32)
+    
+    # Scalar parameters, stored in the params array the step kernel reads
+    dt = _param(_DT)
+    solar_capacity = _param(_SOLAR_CAPACITY)
+    wind_capacity = _param(_WIND_CAPACITY)
+    battery_max_charge_rate = _param(_MAX_CHARGE_RATE)
+    battery_efficiency = _param(_EFFICIENCY)
+    grid_import_cost = _param(_IMPORT_COST)
+    grid_export_price = _param(_EXPORT_PRICE)
+    battery_degradation_cost = _param(_DEGRADATION_COST)
+    frequency_nominal = _param(_FREQUENCY_NOMINAL)
+    voltage_nominal = _param(_VOLTAGE_NOMINAL)
+    
     def __init__(self, seed: Optional[int] = None):
         if seed is not None:
             np.random.seed(seed)
@@ -65,6 +475,7 @@ class MicrogridDigitalTwin:
         
         self.state = GridState()
         self.time_step = 0
+        self.params = np.zeros(10)
         self.dt = 0.1  # Time step in hours (6 minutes)
         
         # System parameters
@@ -78,30 +489,31 @@ class MicrogridDigitalTwin:
         self.grid_export_price = 4.0
         self.battery_degradation_cost = 0.5
         
-        # Reward function weights (configurable for tuning)
-        self.reward_weights = {
-            'stability': 100,      # Primary objective: grid stability
-            'renewable': 20,       # Encourage renewable utilization
-            'battery_health': 10,  # Preserve battery lifetime
-            'soc_penalty': -50,    # Avoid extreme SOC levels
-            'instability_penalty': -100  # Severe penalty for instability
-        }
+        # Reward function weights (configurable for tuning), indexed by the
+        # REWARD_* constants
+        self.reward_weights = np.array([
+            100.0,   # REWARD_STABILITY: primary objective, grid stability
+            20.0,    # REWARD_RENEWABLE: encourage renewable utilization
+            10.0,    # REWARD_BATTERY_HEALTH: preserve battery lifetime
+            -50.0,   # REWARD_SOC_PENALTY: avoid extreme SOC levels
+            -100.0,  # REWARD_INSTABILITY_PENALTY: severe penalty for instability
+        ])
         
         # Grid stability parameters
         self.frequency_nominal = 50.0  # Hz
         self.voltage_nominal = 1.0     # pu
         
-        # Event tracking
-        self.active_events = []
-        self.event_timers = {}
+        # Event tracking: bitmask of active events plus per-event countdowns
+        self._event_mask = 0
+        self._event_timers = np.zeros(4, dtype=np.int32)
         
-        # Safety violation tracking
-        self.safety_violations = {
-            'frequency_violations': 0,
-            'voltage_violations': 0,
-            'soc_violations': 0,
-            'total_violations': 0
-        }
+        # Safety violation counts, indexed by FREQUENCY_VIOLATIONS,
+        # VOLTAGE_VIOLATIONS, SOC_VIOLATIONS and TOTAL_VIOLATIONS
+        self.safety_violations = np.zeros(4, dtype=np.int64)
+        
+        # Prefetched standard normal draws, consumed in order
+        self._noise = np.empty(0)
+        self._noise_idx = 0
         
         # Initialize state
         self._initialize_state()
@@ -148,377 +560,124 @@ class MicrogridDigitalTwin:
             reward: Reward signal
             done: Episode termination flag
         """
-        # Parse action
-        battery_charge_cmd = np.clip(action[0], 0, 1)
-        battery_discharge_cmd = np.clip(action[1], 0, 1)
-        load_shift_cmd = np.clip(action[2], 0, 1)
-        grid_import_cmd = np.clip(action[3], 0, 1)
-        curtailment_cmd = np.clip(action[4], 0, 1)
-        
-        # Update time
+        # The kernel advances time_of_day; the step count lives here
         self.time_step += 1
-        self.state.time_of_day = (self.state.time_of_day + self.dt) % 24
-        
-        # Update weather and generation
-        self._update_weather()
-        self._update_solar_generation()
-        self._update_wind_generation()
-        self._update_load_demand()
-        
-        # Process events
-        self._process_events()
-        
-        # Calculate available renewable energy
-        available_renewable = self.state.solar_generation + self.state.wind_generation
-        
-        # Apply curtailment
-        curtailed_renewable = available_renewable * (1 - curtailment_cmd * 0.5)
-        
-        # Calculate energy balance
-        net_load = self.state.load_demand
-        
-        # Apply load shifting (reduce load temporarily)
-        shifted_load = net_load * (1 - load_shift_cmd * 0.2)
-        
-        # Battery operations
-        battery_power = 0.0
         
-        if battery_charge_cmd > 0.5 and self.state.battery_soc < 0.95:
-            # Charge battery from excess renewable
-            excess_renewable = max(0, curtailed_renewable - shifted_load)
-            charge_power = min(
-                excess_renewable,
-                battery_charge_cmd * self.battery_max_charge_rate,
-                (0.95 - self.state.battery_soc) * self.state.battery_capacity / self.dt
-            )
-            battery_power = -charge_power  # Negative = charging
-            
-        elif battery_discharge_cmd > 0.5 and self.state.battery_soc > 0.1:
-            # Discharge battery to meet load
-            deficit = max(0, shifted_load - curtailed_renewable)
-            discharge_power = min(
-                deficit,
-                battery_discharge_cmd * self.battery_max_charge_rate,
-                (self.state.battery_soc - 0.1) * self.state.battery_capacity / self.dt
-            )
-            battery_power = discharge_power  # Positive = discharging
-        
-        # Update battery SOC
-        energy_change = battery_power * self.dt
-        if battery_power < 0:  # Charging
-            energy_change *= self.battery_efficiency
-        else:  # Discharging
-            energy_change /= self.battery_efficiency
-        
-        self.state.battery_soc = np.clip(
-            self.state.battery_soc - energy_change / self.state.battery_capacity,
-            0.0, 1.0
+        next_state = np.empty(13, dtype=np.float32)
+        reward, done = _step_kernel(
+            self.state.values, np.ascontiguousarray(action, dtype=np.float64), self._standard_normal(4),
+            self.params, self.reward_weights, self.safety_violations, self.time_step, next_state
         )
-        self.state.battery_charge_rate = battery_power
-        
-        # Battery degradation
-        self.state.battery_health *= 0.9999  # Slow degradation
-        
-        # Calculate grid import/export
-        grid_balance = shifted_load - curtailed_renewable - battery_power
-        
-        # Grid import control
-        if grid_import_cmd > 0.5:
-            self.state.grid_import = grid_balance
-        else:
-            self.state.grid_import = max(0, grid_balance)  # No export
-        
-        # Update grid frequency and voltage based on balance
-        self._update_grid_dynamics(grid_balance)
-        
-        # Update stability score
-        self._update_stability_score()
-        
-        # Calculate cost
-        self._calculate_energy_cost()
-        
-        # Calculate reward
-        reward = self._calculate_reward()
         
-        # Check termination
-        done = self._check_termination()
-        
-        # Get next state vector
-        next_state = self.get_state_vector()
+        # Process events (only resets weather, which the rest of the step
+        # no longer reads but the state vector does)
+        if self._process_events():
+            next_state = self.get_state_vector()
         
         return next_state, reward, done
     
-    def _update_weather(self):
-        """Update weather conditions with realistic dynamics"""
-        # Cloud cover - random walk with tendency to clear
-        self.state.cloud_cover = np.clip(
-            self.state.cloud_cover + np.random.normal(0, 0.05) - 0.01,
-            0.0, 1.0
-        )
-        
-        # Wind speed - random walk
-        self.state.wind_speed = np.clip(
-            self.state.wind_speed + np.random.normal(0, 1.0),
-            0.0, 25.0
-        )
-        
-        # Temperature - daily cycle
-        hour_angle = (self.state.time_of_day - 14) * np.pi / 12
-        daily_temp = 27 + 8 * np.cos(hour_angle)
-        self.state.temperature = daily_temp + np.random.normal(0, 1)
+    def _standard_normal(self, n: int, prefetch: bool = True) -> np.ndarray:
+        """
+        Next n standard normal draws from the prefetched block
+        
+        Leftover draws are carried into each refill, so while this twin is
+        the only consumer of the global np.random stream its sequence is
+        the same as drawing one call at a time. Twins sharing the stream
+        (e.g. the dashboard's comparison mode) take whole blocks instead of
+        interleaving per step, so their trajectories differ from per-step
+        draws. Without prefetch, a refill draws only what is needed (for
+        one-off draws like resets).
+        """
+        i = self._noise_idx
+        if i + n > len(self._noise):
+            self._noise = np.concatenate(
+                (self._noise[i:], np.random.standard_normal(self.NOISE_BLOCK if prefetch else n))
+            )
+            i = 0
+        self._noise_idx = i + n
+        return self._noise[i:i + n]
     
     def _update_solar_generation(self):
         """Calculate solar generation based on time and weather"""
-        # Solar irradiance model
-        hour_angle = (self.state.time_of_day - 12) * np.pi / 12
-        
-        # Daylight hours (6 AM to 6 PM)
-        if 6 <= self.state.time_of_day <= 18:
-            # Peak at noon
-            base_irradiance = np.cos(hour_angle)
-            base_irradiance = max(0, base_irradiance)
-            
-            # Cloud impact
-            cloud_factor = 1 - 0.8 * self.state.cloud_cover
-            
-            # Seasonal variation
-            seasonal_factor = 1 + 0.2 * np.sin(2 * np.pi * self.state.day_of_year / 365)
-            
-            # Temperature derating (solar panels lose efficiency at high temp)
-            temp_factor = 1 - 0.004 * max(0, self.state.temperature - 25)
-            
-            self.state.solar_generation = (
-                self.solar_capacity * 
-                base_irradiance * 
-                cloud_factor * 
-                seasonal_factor * 
-                temp_factor
-            )
-        else:
-            self.state.solar_generation = 0.0
+        self.state.solar_generation = _solar_output(
+            self.state.time_of_day, self.state.day_of_year, self.state.cloud_cover,
+            self.state.temperature, self.solar_capacity
+        )
     
     def _update_wind_generation(self):
         """Calculate wind generation based on wind speed"""
-        # Wind power curve (simplified)
-        v = self.state.wind_speed
-        
-        if v < 3:  # Cut-in speed
-            power = 0
-        elif v < 12:  # Linear region
-            power = (v - 3) / 9
-        elif v < 25:  # Rated region
-            power = 1.0
-        else:  # Cut-out
-            power = 0
-        
-        self.state.wind_generation = self.wind_capacity * power
+        self.state.wind_generation = _wind_output(self.state.wind_speed, self.wind_capacity)
     
     def _update_load_demand(self):
         """Calculate load demand with daily and random variation"""
-        # Daily load pattern
-        hour = self.state.time_of_day
-        
-        # Morning peak (7-9 AM)
-        morning_peak = 0.3 * np.exp(-((hour - 8)**2) / 2)
-        
-        # Evening peak (6-10 PM)
-        evening_peak = 0.5 * np.exp(-((hour - 20)**2) / 4)
-        
-        # Base load
-        base_load = 0.4
-        
-        # Weekend/weekday difference
-        day_type_factor = 0.9 if self.state.day_of_year % 7 in [0, 6] else 1.0
-        
-        # Random variation
-        random_factor = 1 + np.random.normal(0, 0.1)
-        
-        load_factor = (base_load + morning_peak + evening_peak) * day_type_factor * random_factor
-        
-        # Total load (assuming 800 kW peak)
-        self.state.load_demand = 800 * np.clip(load_factor, 0.3, 1.0)
-    
-    def _update_grid_dynamics(self, power_imbalance: float):
-        """Update grid frequency and voltage based on power balance"""
-        # Frequency deviation proportional to power imbalance
-        # Positive imbalance = deficit = frequency drop
-        frequency_deviation = -power_imbalance / 1000.0  # Hz
-        
-        self.state.grid_frequency = np.clip(
-            self.frequency_nominal + frequency_deviation,
-            49.0, 51.0
-        )
-        
-        # Voltage affected by reactive power (simplified)
-        voltage_deviation = -abs(power_imbalance) / 2000.0
-        self.state.grid_voltage = np.clip(
-            self.voltage_nominal + voltage_deviation,
-            0.9, 1.1
+        self.state.load_demand = _load_output(
+            self.state.time_of_day, self.state.day_of_year, self._standard_normal(1, prefetch=False)[0]
         )
     
     def _update_stability_score(self):
         """Calculate grid stability score (0-1) and track violations"""
-        # Frequency stability
-        freq_deviation = abs(self.state.grid_frequency - 50.0)
-        freq_score = max(0, 1 - freq_deviation / 1.0)  # ±1 Hz tolerance
-        
-        # Track frequency violations
-        if freq_deviation > 0.5:  # Beyond normal operating range
-            self.safety_violations['frequency_violations'] += 1
-            self.safety_violations['total_violations'] += 1
-        
-        # Voltage stability
-        volt_deviation = abs(self.state.grid_voltage - 1.0)
-        volt_score = max(0, 1 - volt_deviation / 0.1)  # ±0.1 pu tolerance
-        
-        # Track voltage violations
-        if volt_deviation > 0.05:  # Beyond normal operating range
-            self.safety_violations['voltage_violations'] += 1
-            self.safety_violations['total_violations'] += 1
-        
-        # Battery health
-        battery_score = self.state.battery_health
-        
-        # Track SOC violations
-        if self.state.battery_soc < 0.1 or self.state.battery_soc > 0.95:
-            self.safety_violations['soc_violations'] += 1
-            self.safety_violations['total_violations'] += 1
-        
-        # Supply-demand balance
-        total_generation = (
-            self.state.solar_generation + 
-            self.state.wind_generation + 
-            abs(self.state.battery_charge_rate) +
-            max(0, self.state.grid_import)
-        )
-        balance_ratio = min(total_generation / max(self.state.load_demand, 1), 1.0)
-        
-        # Combined stability score
-        self.state.stability_score = (
-            0.3 * freq_score +
-            0.3 * volt_score +
-            0.2 * battery_score +
-            0.2 * balance_ratio
+        self.state.stability_score, *violations = _stability(
+            self.state.grid_frequency, self.state.grid_voltage, self.state.battery_health,
+            self.state.battery_soc, self.state.solar_generation, self.state.wind_generation,
+            self.state.battery_charge_rate, self.state.grid_import, self.state.load_demand
         )
+        _count_violations(self.safety_violations, *violations)
     
     def _calculate_energy_cost(self):
         """Calculate energy cost in INR"""
-        # Grid import cost
-        import_cost = max(0, self.state.grid_import) * self.grid_import_cost * self.dt
-        
-        # Grid export revenue (negative cost)
-        export_revenue = max(0, -self.state.grid_import) * self.grid_export_price * self.dt
-        
-        # Battery degradation cost
-        battery_cost = abs(self.state.battery_charge_rate) * self.battery_degradation_cost * self.dt
-        
-        # Total cost
-        self.state.energy_cost = import_cost - export_revenue + battery_cost
-    
-    def _calculate_reward(self) -> float:
-        """Calculate RL reward signal using configurable weights"""
-        # Stability reward (most important)
-        stability_reward = self.reward_weights['stability'] * self.state.stability_score
-        
-        # Cost penalty
-        cost_penalty = -self.state.energy_cost
-        
-        # Renewable utilization bonus
-        renewable_generation = self.state.solar_generation + self.state.wind_generation
-        renewable_ratio = min(renewable_generation / max(self.state.load_demand, 1), 1.0)
-        renewable_bonus = self.reward_weights['renewable'] * renewable_ratio
-        
-        # Battery health preservation
-        battery_bonus = self.reward_weights['battery_health'] * self.state.battery_health
-        
-        # Penalty for extreme battery SOC
-        if self.state.battery_soc < 0.15 or self.state.battery_soc > 0.95:
-            soc_penalty = self.reward_weights['soc_penalty']
-        else:
-            soc_penalty = 0
-        
-        # Penalty for grid instability
-        if self.state.stability_score < 0.7:
-            instability_penalty = self.reward_weights['instability_penalty']
-        else:
-            instability_penalty = 0
-        
-        # Total reward
-        reward = (
-            stability_reward +
-            cost_penalty +
-            renewable_bonus +
-            battery_bonus +
-            soc_penalty +
-            instability_penalty
+        self.state.energy_cost = _energy_cost(
+            self.state.grid_import, self.state.battery_charge_rate, self.dt,
+            self.grid_import_cost, self.grid_export_price, self.battery_degradation_cost
         )
-        
-        return reward
-    
-    def _check_termination(self) -> bool:
-        """Check if episode should terminate"""
-        # Terminate on severe instability
-        if self.state.stability_score < 0.5:
-            return True
-        
-        # Terminate on battery failure
-        if self.state.battery_health < 0.5:
-            return True
-        
-        # Terminate on excessive grid frequency deviation
-        if abs(self.state.grid_frequency - 50.0) > 2.0:
-            return True
-        
-        # Normal termination after long episode
-        if self.time_step > 1000:
-            return True
-        
-        return False
     
     def inject_event(self, event_type: str):
         """Inject stress test events"""
         if event_type == 'cloud_cover':
             self.state.cloud_cover = 0.9
-            self.active_events.append('cloud_cover')
-            self.event_timers['cloud_cover'] = 10
-            
         elif event_type == 'wind_drop':
             self.state.wind_speed = 1.0
-            self.active_events.append('wind_drop')
-            self.event_timers['wind_drop'] = 15
-            
         elif event_type == 'peak_demand':
             self.state.load_demand *= 1.5
-            self.active_events.append('peak_demand')
-            self.event_timers['peak_demand'] = 20
-            
         elif event_type == 'battery_degradation':
             self.state.battery_health *= 0.8
-            self.active_events.append('battery_degradation')
-            self.event_timers['battery_degradation'] = 5
-    
-    def _process_events(self):
-        """Process active events and timers"""
-        expired_events = []
-        
-        for event in self.active_events:
-            if event in self.event_timers:
-                self.event_timers[event] -= 1
-                
-                if self.event_timers[event] <= 0:
-                    expired_events.append(event)
-        
-        # Remove expired events
-        for event in expired_events:
-            self.active_events.remove(event)
-            del self.event_timers[event]
-            
-            # Reset conditions
-            if event == 'cloud_cover':
-                self.state.cloud_cover = 0.2
-            elif event == 'wind_drop':
-                self.state.wind_speed = 10.0
-            # Note: peak_demand and battery_degradation don't auto-reset
+        else:
+            return
+        
+        # Re-injecting an active event restarts its countdown
+        k = self.EVENTS.index(event_type)
+        self._event_mask |= 1 << k
+        self._event_timers[k] = self.EVENT_DURATIONS[k]
+    
+    @property
+    def active_events(self) -> list:
+        """Names of the currently active events"""
+        return [event for k, event in enumerate(self.EVENTS) if self._event_mask >> k & 1]
+    
+    @property
+    def event_timers(self) -> dict:
+        """Steps remaining for each active event"""
+        return {event: int(self._event_timers[k]) for k, event in enumerate(self.EVENTS)
+                if self._event_mask >> k & 1}
+    
+    def _process_events(self) -> bool:
+        """Process active events and timers; True if any event expired"""
+        if not self._event_mask:
+            return False
+        
+        # Count down active events only, then drop the ones that reached zero
+        active = (self._EVENT_BITS & self._event_mask) != 0
+        self._event_timers -= active
+        expired = int(self._EVENT_BITS[active & (self._event_timers <= 0)].sum())
+        if not expired:
+            return False
+        self._event_mask &= ~expired
+        
+        # Reset conditions (peak_demand and battery_degradation don't auto-reset)
+        if expired & 1:
+            self.state.cloud_cover = 0.2
+        if expired & 2:
+            self.state.wind_speed = 10.0
+        return True
     
     def get_state_vector(self, forecast_solar: float = None, forecast_wind: float = None, 
                          forecast_load: float = None) -> np.ndarray:
@@ -536,41 +695,91 @@ class MicrogridDigitalTwin:
         Returns:
             State vector with current + predicted values (13 dimensions)
         """
-        # Current state (10 dimensions)
-        current_state = [
-            self.state.solar_generation / self.solar_capacity,
-            self.state.wind_generation / self.wind_capacity,
-            self.state.load_demand / 1000.0,
-            self.state.battery_soc,
-            self.state.battery_health,
-            self.state.grid_import / 1000.0,
-            (self.state.grid_frequency - 50.0) / 2.0,
-            self.state.grid_voltage - 1.0,
-            self.state.cloud_cover,
-            self.state.wind_speed / 25.0
-        ]
+        # Current state (10 dimensions), followed by the current generation
+        # and load in place of a forecast (reactive mode)
+        vector = np.empty(13, dtype=np.float32)
+        _write_state_vector(self.state.values, self.solar_capacity, self.wind_capacity, vector)
         
         # Forecasted values (3 dimensions) - enables predictive control
         if forecast_solar is not None and forecast_wind is not None and forecast_load is not None:
-            forecast_state = [
-                forecast_solar / self.solar_capacity,
-                forecast_wind / self.wind_capacity,
-                forecast_load / 1000.0
-            ]
-        else:
-            # If no forecast available, use current values (reactive mode)
-            forecast_state = [
-                self.state.solar_generation / self.solar_capacity,
-                self.state.wind_generation / self.wind_capacity,
-                self.state.load_demand / 1000.0
-            ]
+            vector[10] = forecast_solar / self.solar_capacity
+            vector[11] = forecast_wind / self.wind_capacity
+            vector[12] = forecast_load / 1000.0
         
-        return np.array(current_state + forecast_state, dtype=np.float32)
+        return vector
     
     def reset(self):
         """Reset simulator to initial state"""
         self.time_step = 0
-        self.active_events = []
-        self.event_timers = {}
+        self._event_mask = 0
+        self._event_timers[:] = 0
         self._initialize_state()
         return self.get_state_vector()
+
+
+class MicrogridBatch:
+    """
+    N independent digital twins advanced together by one compiled kernel
+    
+    Each environment is one row of a (N, fields) state array, so a batch
+    step is a single parallel loop over rows instead of N Python step()
+    calls. Meant for rollouts and policy evaluation: there is no event
+    injection, and environments that finish are restarted by reset_done().
+    """
+    
+    def __init__(self, n_envs: int, seed: Optional[int] = None):
+        if seed is not None:
+            np.random.seed(seed)
+            random.seed(seed)
+        
+        self.n_envs = n_envs
+        
+        # Parameters come from a default twin (all environments share them)
+        twin = MicrogridDigitalTwin()
+        self.params = twin.params
+        self.reward_weights = twin.reward_weights
+        
+        self.states = np.empty((n_envs, len(GridState.FIELDS)))
+        self.time_steps = np.zeros(n_envs, dtype=np.int64)
+        self.state_vectors = np.empty((n_envs, 13), dtype=np.float32)
+        self.rewards = np.zeros(n_envs)
+        self.dones = np.zeros(n_envs, dtype=np.bool_)
+        self.violations = np.zeros((n_envs, 4), dtype=np.int64)  # safety_violations rows
+        
+        self.states[0] = twin.state.values
+        for i in range(1, n_envs):
+            self.states[i] = MicrogridDigitalTwin().state.values
+    
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Execute one simulation step in every environment
+        
+        Args:
+            actions: (N, 5) commands, as for MicrogridDigitalTwin.step
+        
+        Returns:
+            next_states: (N, 13) state vectors
+            rewards: (N,) reward signals
+            dones: (N,) episode termination flags
+        """
+        actions = np.ascontiguousarray(actions, dtype=np.float64)
+        noise = np.random.standard_normal((self.n_envs, 4))
+        
+        _step_batch(self.states, actions, noise, self.params, self.reward_weights,
+                    self.time_steps, self.state_vectors, self.rewards, self.dones,
+                    self.violations)
+        
+        return self.state_vectors, self.rewards, self.dones
+    
+    def reset_done(self) -> np.ndarray:
+        """Restart finished environments from fresh initial states; returns state vectors"""
+        for i in np.flatnonzero(self.dones):
+            self.states[i] = MicrogridDigitalTwin().state.values
+            self.time_steps[i] = 0
+            self.dones[i] = False
+        return self.get_state_vectors()
+    
+    def get_state_vectors(self) -> np.ndarray:
+        """(N, 13) reactive-mode state vectors, as MicrogridDigitalTwin.get_state_vector()"""
+        _write_state_vectors(self.states, self.params, self.state_vectors)
+        return self.state_vectors
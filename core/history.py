@@ -0,0 +1,238 @@
+"""
+Simulation History - Struct-of-Arrays Step Log
+Preallocated NumPy columns for fast dashboard reductions
+"""
+
+import os
+import uuid
+import numpy as np
+from operator import itemgetter
+from typing import Optional
+
+from .grid_simulator import GridState
+
+
+def renewable_share(solar, wind, load):
+    """
+    Renewable generation as a percentage of demand
+
+    Works element-wise on scalars or whole history columns; demand is
+    floored at 1 kW to avoid dividing by zero.
+    """
+    return (solar + wind) / np.maximum(load, 1.0) * 100.0
+
+
+class GridHistory:
+    """
+    Fixed-capacity ring buffer of simulator steps, stored column-wise
+
+    Each logged GridState field lives in its own contiguous float32 array,
+    so dashboard statistics are single NumPy reductions over a slice
+    instead of attribute walks over a list of GridState objects.
+
+    Run totals and trailing-window sums for the statistics panels are
+    updated incrementally on append, so reading them is O(1).
+
+    With `spill_dir` set, rows are written to Parquet part files (zstd)
+    in half-buffer chunks just before the ring overwrites them, so long
+    runs keep bounded memory without losing the full log. Each history
+    writes into its own `run-<id>` subdirectory (the `spill_dir`
+    attribute), so reusing a directory never mixes or overwrites runs.
+    Spilling needs pyarrow, which is not in requirements.txt.
+    """
+
+    # GridState fields captured on every step
+    FIELDS = (
+        'solar_generation',
+        'wind_generation',
+        'load_demand',
+        'battery_soc',
+        'stability_score',
+        'energy_cost',
+        'grid_frequency',
+        'grid_import',
+        'cloud_cover',
+    )
+
+    # Picks every logged field out of GridState.values.tolist() in one C-level call
+    _get_fields = itemgetter(*(GridState.FIELDS.index(name) for name in FIELDS))
+
+    # Stability below this counts as an outage step
+    OUTAGE_THRESHOLD = 0.7
+    # Stability above this counts as a high-stability step
+    HIGH_STABILITY_THRESHOLD = 0.9
+    # Demand above this (kW) counts as a peak-load step
+    PEAK_LOAD_THRESHOLD = 700.0
+
+    # Decision-log explanation flags, set per step in the 'explain' column
+    EXPLAIN_CHARGE_LOW_SOC = 1      # charging while SOC < 30%
+    EXPLAIN_DISCHARGE_DEMAND = 2    # discharging while demand exceeds renewables
+    EXPLAIN_SHIFT_STABILITY = 4     # shifting load while stability < 80%
+
+    def __init__(self, capacity: int = 1000, action_dim: int = 5, window: int = 100,
+                 spill_dir: Optional[str] = None):
+        self.capacity = capacity
+        self.window = min(window, capacity)
+
+        # Parquet spill of rows evicted from the ring buffer
+        self.spill_dir = None
+        self.spill_chunk = max(capacity // 2, 1)
+        self.spilled_parts = 0
+        if spill_dir is not None:
+            self.spill_dir = os.path.join(spill_dir, f'run-{uuid.uuid4().hex}')
+            os.makedirs(self.spill_dir)
+
+        # One preallocated column per state field
+        self.columns = {
+            name: np.empty(capacity, dtype=np.float32) for name in self.FIELDS
+        }
+        self.time = np.empty(capacity, dtype=np.int32)  # step index, sent to Plotly as-is
+        self.actions = np.empty((capacity, action_dim), dtype=np.float32)
+        self.rewards = np.empty(capacity, dtype=np.float32)
+        self.renewable_pct = np.empty(capacity, dtype=np.float32)
+        self.explain = np.empty(capacity, dtype=np.uint8)
+
+        # Total number of steps written (slot = write_idx % capacity)
+        self.write_idx = 0
+
+        # Running aggregates over every step / the trailing window
+        self.totals = dict.fromkeys(('stability', 'cost', 'renewable', 'solar', 'wind'), 0.0)
+        self.window_sums = dict.fromkeys(('stability', 'cost', 'renewable'), 0.0)
+        self.outages = 0
+        self.high_stability_count = 0
+        self.peak_load_count = 0
+
+    def __len__(self) -> int:
+        return min(self.write_idx, self.capacity)
+
+    def append(self, step: int, state: GridState, action: np.ndarray, reward: float):
+        """Copy one simulator step into the next ring buffer slot"""
+        i = self.write_idx % self.capacity
+        columns = self.columns
+
+        # Persist the oldest chunk before the ring starts overwriting it
+        if self.spill_dir is not None and self.write_idx >= self.capacity and i % self.spill_chunk == 0:
+            self._spill(i, min(i + self.spill_chunk, self.capacity))
+
+        # Drop the step sliding out of the window before its slot is reused
+        if self.write_idx >= self.window:
+            j = (self.write_idx - self.window) % self.capacity
+            self.window_sums['stability'] -= float(columns['stability_score'][j])
+            self.window_sums['cost'] -= float(columns['energy_cost'][j])
+            self.window_sums['renewable'] -= float(self.renewable_pct[j])
+
+        self.time[i] = step
+        fields = self._get_fields(state.values.tolist())
+        for column, value in zip(columns.values(), fields):
+            column[i] = value
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.renewable_pct[i] = renewable_share(*fields[:3])  # solar, wind, load
+
+        # Accumulate the stored float32 values so evictions cancel exactly
+        stability = float(columns['stability_score'][i])
+        cost = float(columns['energy_cost'][i])
+        renewable = float(self.renewable_pct[i])
+        load = float(columns['load_demand'][i])
+
+        # Decision-log flags, from the same stored values the log displays
+        charge, discharge, shift = self.actions[i, :3].tolist()
+        flags = 0
+        if columns['battery_soc'][i] < 0.3 and charge > 0.5:
+            flags |= self.EXPLAIN_CHARGE_LOW_SOC
+        if load > columns['solar_generation'][i] + columns['wind_generation'][i] and discharge > 0.5:
+            flags |= self.EXPLAIN_DISCHARGE_DEMAND
+        if stability < 0.8 and shift > 0.3:
+            flags |= self.EXPLAIN_SHIFT_STABILITY
+        self.explain[i] = flags
+
+        self.totals['stability'] += stability
+        self.totals['cost'] += cost
+        self.totals['renewable'] += renewable
+        self.totals['solar'] += float(columns['solar_generation'][i])
+        self.totals['wind'] += float(columns['wind_generation'][i])
+        self.outages += stability < self.OUTAGE_THRESHOLD
+        self.high_stability_count += stability > self.HIGH_STABILITY_THRESHOLD
+        self.peak_load_count += load > self.PEAK_LOAD_THRESHOLD
+
+        self.window_sums['stability'] += stability
+        self.window_sums['cost'] += cost
+        self.window_sums['renewable'] += renewable
+
+        # Publish the row only after all columns are written
+        self.write_idx += 1
+
+    def mean(self, key: str) -> float:
+        """Mean of a running total ('stability', 'cost', ...) over all steps"""
+        return self.totals[key] / max(self.write_idx, 1)
+
+    def window_mean(self, key: str) -> float:
+        """Mean of a tracked metric over the trailing window"""
+        return self.window_sums[key] / max(min(self.write_idx, self.window), 1)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """
+        Get a column in chronological order
+
+        Args:
+            name: A GridState field from FIELDS, or 'time', 'actions',
+                'rewards', 'renewable_pct', 'explain'
+
+        Returns:
+            View of the logged values (a copy once the ring buffer has wrapped)
+        """
+        array = self._column(name)
+
+        if self.write_idx <= self.capacity:
+            return array[:self.write_idx]
+
+        # Buffer has wrapped: oldest row sits at the write position
+        start = self.write_idx % self.capacity
+        return np.concatenate((array[start:], array[:start]))
+
+    def tail(self, name: str, k: int) -> np.ndarray:
+        """Last k logged values of a column, without unrolling the whole ring"""
+        k = min(k, len(self))
+        array = self._column(name)
+
+        end = self.write_idx % self.capacity
+        start = end - k
+        if start >= 0:
+            return array[start:end]
+        return np.concatenate((array[start:], array[:end]))
+
+    def latest(self, name: str):
+        """Most recently logged value of a column (requires at least one step)"""
+        return self._column(name)[(self.write_idx - 1) % self.capacity]
+
+    def _spill(self, start: int, stop: int):
+        """Write ring buffer slots [start, stop) to the next Parquet part file"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        data = {'time': self.time[start:stop]}
+        for name, column in self.columns.items():
+            data[name] = column[start:stop]
+        data['reward'] = self.rewards[start:stop]
+        data['renewable_pct'] = self.renewable_pct[start:stop]
+        data['explain'] = self.explain[start:stop]
+        for k in range(self.actions.shape[1]):
+            data[f'action_{k}'] = np.ascontiguousarray(self.actions[start:stop, k])
+
+        path = os.path.join(self.spill_dir, f'part-{self.spilled_parts:05d}.parquet')
+        pq.write_table(pa.table(data), path, compression='zstd')
+        self.spilled_parts += 1
+
+    def _column(self, name: str) -> np.ndarray:
+        """Underlying ring buffer storage for a column name"""
+        if name == 'time':
+            return self.time
+        if name == 'actions':
+            return self.actions
+        if name == 'rewards':
+            return self.rewards
+        if name == 'renewable_pct':
+            return self.renewable_pct
+        if name == 'explain':
+            return self.explain
+        return self.columns[name]
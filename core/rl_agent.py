@@ -3,15 +3,209 @@ Reinforcement Learning Agent - PPO-based Grid Controller
 Includes both RL agent and rule-based baseline controller
 """
 
+import math
 import numpy as np
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import torch.optim as optim
-from collections import deque
 import random
-from typing import Tuple
+import warnings
+from numba import njit, prange
+from typing import Optional, Tuple
 from .grid_simulator import GridState
 
+
+def _script(fn):
+    """torch.jit.script, without the deprecation warning newer PyTorch emits"""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', FutureWarning)
+        return torch.jit.script(fn)
+
+
+@_script
+def ppo_advantages(rewards: torch.Tensor, values: torch.Tensor, next_values: torch.Tensor,
+                   dones: torch.Tensor, gamma: float):
+    """TD targets and normalized single-step advantages, fused by TorchScript"""
+    td_target = rewards + gamma * next_values * (1 - dones)
+    advantages = td_target - values
+    advantages = (advantages - advantages.mean()) / (advantages.std() + 1e-8)
+    return td_target, advantages
+
+
+def _adam(params, lr: float) -> optim.Optimizer:
+    """Adam with the fused single-kernel update where PyTorch supports it (CPU: 2.4+)"""
+    params = list(params)
+    try:
+        return optim.Adam(params, lr=lr, fused=True)
+    except (RuntimeError, TypeError):
+        return optim.Adam(params, lr=lr)
+
+
+def _flatten_parameters(module: nn.Module) -> torch.Tensor:
+    """
+    Move a module's parameters into one contiguous buffer, in place
+    
+    Every parameter keeps its identity (optimizers and state_dict are
+    unaffected) but its data becomes a view into the returned 1-D tensor,
+    so whole-network arithmetic is a single elementwise op on it. The
+    views break if the module is later moved with .to() or reassigned.
+    """
+    params = list(module.parameters())
+    flat = torch.cat([p.detach().reshape(-1) for p in params])
+    offset = 0
+    for p in params:
+        n = p.numel()
+        p.data = flat[offset:offset + n].view_as(p)
+        offset += n
+    return flat
+
+
+@njit(cache=True)
+def _reverse_discounted_sum(deltas, decay):
+    """Reverse scan A[t] = deltas[t] + decay[t] * A[t+1], with A[n] = 0"""
+    out = np.empty_like(deltas)
+    running = 0.0
+    for t in range(deltas.shape[0] - 1, -1, -1):
+        running = deltas[t] + decay[t] * running
+        out[t] = running
+    return out
+
+
+def gae_advantages(rewards: torch.Tensor, values: torch.Tensor, next_values: torch.Tensor,
+                   dones: torch.Tensor, cuts: torch.Tensor, gamma: float, lam: float):
+    """
+    GAE(lambda) advantages over a rollout of 1-D tensors, in one pass
+
+    TD errors are computed vectorized; the (gamma * lambda) accumulation
+    is a single compiled reverse scan. The scan restarts after every
+    transition where `cuts` is set (episode ends, including truncated
+    ones), while `dones` alone decides whether next_values is bootstrapped.
+
+    Returns:
+        (value targets, normalized advantages)
+    """
+    deltas = rewards + gamma * next_values * (1 - dones) - values
+    decay = gamma * lam * (1 - cuts)
+    advantages = torch.from_numpy(_reverse_discounted_sum(deltas.numpy(), decay.numpy()))
+    target_values = advantages + values
+    advantages = (advantages - advantages.mean()) / (advantages.std() + 1e-8)
+    return target_values, advantages
+
+
+@_script
+def gaussian_log_prob_entropy(mean: torch.Tensor, log_std: torch.Tensor, action: torch.Tensor):
+    """
+    Log probability and entropy of a diagonal Gaussian policy, summed over
+    action dimensions, without building a torch.distributions.Normal
+    """
+    log_prob = (
+        -(action - mean) ** 2 / (2 * torch.exp(2 * log_std))
+        - log_std
+        - 0.5 * math.log(2 * math.pi)
+    )
+    entropy = (0.5 + 0.5 * math.log(2 * math.pi) + log_std).sum(-1)
+    return log_prob.sum(-1), entropy.expand(action.shape[:-1])
+
+
+@_script
+def ppo_policy_loss(log_probs: torch.Tensor, old_log_probs: torch.Tensor,
+                    advantages: torch.Tensor, entropy: torch.Tensor,
+                    clip: float, entropy_coef: float) -> torch.Tensor:
+    """Clipped surrogate objective with entropy bonus, fused by TorchScript"""
+    ratio = torch.exp(log_probs - old_log_probs)
+    surr1 = ratio * advantages
+    surr2 = torch.clamp(ratio, 1 - clip, 1 + clip) * advantages
+    return -torch.min(surr1, surr2).mean() - entropy_coef * entropy.mean()
+
+
+class ReplayBuffer:
+    """
+    Fixed-capacity ring buffer of transitions, stored column-wise
+
+    Each field lives in one preallocated array, so storing a transition is
+    a handful of row writes and a training batch is one fancy-index gather
+    per column, instead of tuples in a deque rebuilt into arrays every step.
+    
+    With `action_dim` None, actions are stored as discrete integer indices.
+    """
+    
+    def __init__(self, capacity: int, state_dim: int, action_dim: Optional[int] = None):
+        self.capacity = capacity
+        self.states = np.zeros((capacity, state_dim), dtype=np.float32)
+        if action_dim is None:
+            self.actions = np.zeros(capacity, dtype=np.int64)
+        else:
+            self.actions = np.zeros((capacity, action_dim), dtype=np.float32)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_dim), dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.float32)
+        self.truncated = np.zeros(capacity, dtype=np.float32)
+        
+        # Next slot to write, and number of valid transitions
+        self.ptr = 0
+        self.size = 0
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def append(self, state, action=None, reward=None, next_state=None, done=None,
+               truncated=False):
+        """
+        Write one transition over the oldest slot
+        
+        Also accepts a single (state, action, reward, next_state, done[,
+        truncated]) tuple, as the deque-based buffers did.
+        """
+        if action is None:
+            state, action, reward, next_state, done, *rest = state
+            truncated = rest[0] if rest else False
+        i = self.ptr
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        self.truncated[i] = truncated
+        self.ptr = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+    
+    def extend(self, states, actions, rewards, next_states, dones, truncated=False):
+        """Write K transitions (leading axis) with one scatter per column"""
+        k = len(rewards)
+        idx = (self.ptr + np.arange(k)) % self.capacity
+        self.states[idx] = states
+        self.actions[idx] = actions
+        self.rewards[idx] = rewards
+        self.next_states[idx] = next_states
+        self.dones[idx] = dones
+        self.truncated[idx] = truncated
+        self.ptr = (self.ptr + k) % self.capacity
+        self.size = min(self.size + k, self.capacity)
+    
+    def sample(self, batch_size: int) -> Tuple[torch.Tensor, ...]:
+        """
+        Uniformly sampled batch (with replacement)
+        
+        Returns:
+            (states, actions, rewards, next_states, dones, truncated) tensors
+        """
+        return self._gather(np.random.randint(0, self.size, size=batch_size))
+    
+    def latest(self, n: int) -> Tuple[torch.Tensor, ...]:
+        """The n most recent transitions in chronological order, as sample()"""
+        n = min(n, self.size)
+        return self._gather((self.ptr - n + np.arange(n)) % self.capacity)
+    
+    def _gather(self, idx: np.ndarray) -> Tuple[torch.Tensor, ...]:
+        """Rows `idx` of every column, as tensors"""
+        return tuple(
+            torch.from_numpy(column[idx])
+            for column in (self.states, self.actions, self.rewards, self.next_states,
+                           self.dones, self.truncated)
+        )
+
+
 class PolicyNetwork(nn.Module):
     """Actor network for PPO - Gaussian policy for continuous actions"""
     
@@ -47,7 +241,7 @@ class PolicyNetwork(nn.Module):
     
     def get_distribution(self, state):
         """Get the Gaussian distribution for the policy"""
-        mean, std = self.forward(state)
+        mean, std = self(state)  # through __call__, so a compiled forward is used
         return torch.distributions.Normal(mean, std)
     
     def sample_action(self, state):
@@ -66,10 +260,8 @@ class PolicyNetwork(nn.Module):
             log_probs: Log probability of actions
             entropy: Entropy of the distribution
         """
-        dist = self.get_distribution(state)
-        log_probs = dist.log_prob(action).sum(dim=-1)
-        entropy = dist.entropy().sum(dim=-1)
-        return log_probs, entropy
+        mean, _ = self(state)
+        return gaussian_log_prob_entropy(mean, self.log_std, action)
 
 
 class ValueNetwork(nn.Module):
@@ -90,6 +282,38 @@ class ValueNetwork(nn.Module):
         return self.network(state)
 
 
+class ActorCritic(PolicyNetwork):
+    """
+    PPO actor and critic sharing one feature extractor
+    
+    Acts exactly like PolicyNetwork; the value head reads the same
+    features, so evaluate() gets log-probs, entropy and state values from
+    a single pass through the shared layers.
+    """
+    
+    def __init__(self, state_dim: int, action_dim: int, hidden_dim: int = 128):
+        super(ActorCritic, self).__init__(state_dim, action_dim, hidden_dim)
+        self.value_head = nn.Linear(hidden_dim, 1)
+    
+    def value(self, state):
+        """State values, shape (N, 1)"""
+        return self.value_head(self.feature_net(state))
+    
+    def evaluate(self, state, action):
+        """
+        Evaluate actions and states in one trunk pass
+        
+        Returns:
+            log_probs: Log probability of actions
+            entropy: Entropy of the distribution
+            values: State values, shape (N, 1)
+        """
+        features = self.feature_net(state)
+        mean = torch.sigmoid(self.mean_layer(features))
+        log_probs, entropy = gaussian_log_prob_entropy(mean, self.log_std, action)
+        return log_probs, entropy, self.value_head(features)
+
+
 class RLAgent:
     """
     Proximal Policy Optimization (PPO) Agent
@@ -101,25 +325,61 @@ class RLAgent:
     - Anticipates peak demand
     """
     
-    def __init__(self, state_dim: int, action_dim: int, lr: float = 3e-4):
+    def __init__(self, state_dim: int, action_dim: int, lr: float = 3e-4,
+                 mixed_precision: bool = False, compile_model: bool = False,
+                 shared_trunk: bool = False):
+        """
+        Args:
+            state_dim: State vector size
+            action_dim: Action vector size
+            lr: Adam learning rate for both networks
+            mixed_precision: Run the network passes of update() under
+                bfloat16 autocast. Losses, advantages and the weights stay
+                float32. Pays off only with bf16 matrix units and larger
+                batches; for the default 128-wide MLPs on CPU it is slower.
+            compile_model: Compile the policy and value networks in place
+                with torch.compile (PyTorch 2.2+), with dynamic batch sizes
+                so acting (batch 1) and minibatch updates share one graph;
+                the first call pays the compile time
+            shared_trunk: Use one ActorCritic network, whose policy and value
+                heads share the hidden layers, trained on a combined loss
+                with a single optimizer. Halves the hidden-layer work per
+                update, but the value loss (rewards are in the hundreds)
+                also shapes the policy features
+        """
         self.state_dim = state_dim
         self.action_dim = action_dim
+        self.mixed_precision = mixed_precision
+        self.shared_trunk = shared_trunk
+        
+        # Neural networks; with a shared trunk, value is the ActorCritic's
+        # value head (a bound method, not a separate module)
+        if shared_trunk:
+            self.policy = ActorCritic(state_dim, action_dim)
+            self.value = self.policy.value
+        else:
+            self.policy = PolicyNetwork(state_dim, action_dim)
+            self.value = ValueNetwork(state_dim)
         
-        # Neural networks
-        self.policy = PolicyNetwork(state_dim, action_dim)
-        self.value = ValueNetwork(state_dim)
+        # In-place compilation keeps the modules, their parameters and
+        # state_dict keys unchanged, so optimizers and checkpoints still work
+        if compile_model and hasattr(nn.Module, 'compile'):
+            self.policy.compile(dynamic=True)
+            if not shared_trunk:
+                self.value.compile(dynamic=True)
         
-        # Optimizers
-        self.policy_optimizer = optim.Adam(self.policy.parameters(), lr=lr)
-        self.value_optimizer = optim.Adam(self.value.parameters(), lr=lr)
+        # Optimizers (a shared trunk steps everything with policy_optimizer)
+        self.policy_optimizer = _adam(self.policy.parameters(), lr)
+        self.value_optimizer = None if shared_trunk else _adam(self.value.parameters(), lr)
         
         # PPO hyperparameters
         self.gamma = 0.99  # Discount factor
         self.epsilon = 0.2  # PPO clip parameter
         self.gae_lambda = 0.95  # GAE parameter
+        self.value_coef = 0.5  # Value loss weight in the shared-trunk loss
         
         # Experience buffer
-        self.buffer = deque(maxlen=10000)
+        self.buffer = ReplayBuffer(10000, state_dim, action_dim)
         
         # Training mode
         self.training_mode = True
@@ -132,35 +392,52 @@ class RLAgent:
         Select action using current policy
         
         Args:
-            state: Current state vector
+            state: Current state vector, or a (K, state_dim) batch of them
+                (e.g. one per parallel environment) run in one forward pass
             deterministic: If True, use mean action (no sampling)
         
         Returns:
-            action: Action vector [0-1]
+            action: Action vector [0-1], or (K, action_dim) for a batch
         """
-        with torch.no_grad():
-            state_tensor = torch.FloatTensor(state).unsqueeze(0)
+        # inference_mode skips autograd version tracking entirely
+        with torch.inference_mode():
+            state_tensor = torch.as_tensor(state, dtype=torch.float32).reshape(-1, self.state_dim)
             
             if deterministic:
                 # Use mean action for evaluation
                 mean, _ = self.policy(state_tensor)
-                action = mean.numpy()[0]
+                action = mean.numpy()
             else:
                 # Sample from Gaussian policy for exploration
-                action = self.policy.sample_action(state_tensor).numpy()[0]
+                action = self.policy.sample_action(state_tensor).numpy()
         
         # Ensure actions are in valid range
         action = np.clip(action, 0, 1)
         
-        return action
+        return action.reshape(np.shape(state)[:-1] + (self.action_dim,))
     
-    def store_transition(self, state, action, reward, next_state, done):
-        """Store experience in replay buffer"""
-        self.buffer.append((state, action, reward, next_state, done))
+    def store_transition(self, state, action, reward, next_state, done, truncated=False):
+        """
+        Store experience in replay buffer
+        
+        Also accepts a batch: (K, state_dim) states with K-element actions,
+        rewards and flags. update() treats consecutive rows as consecutive
+        steps, so a batch should be one trajectory in time order.
+        
+        `truncated` marks the last step of an episode cut short without
+        `done` (e.g. by a step limit), so GAE does not run into the next one.
+        """
+        if np.ndim(state) == 2:
+            self.buffer.extend(state, action, reward, next_state, done, truncated)
+        else:
+            self.buffer.append(state, action, reward, next_state, done, truncated)
     
     def train_step(self, batch_size: int = 64) -> dict:
         """
-        Perform one PPO training step using proper log probabilities
+        Perform one PPO training step on a random replay minibatch
+        
+        Advantages are one-step TD errors, since sampled transitions are
+        not consecutive; update() is the GAE path for on-policy rollouts.
         
         Returns:
             dict: Training metrics
@@ -169,30 +446,20 @@ class RLAgent:
             return {'policy_loss': 0, 'value_loss': 0, 'entropy': 0}
         
         # Sample batch
-        batch = random.sample(self.buffer, batch_size)
-        states, actions, rewards, next_states, dones = zip(*batch)
-        
-        # Convert to tensors
-        states = torch.FloatTensor(np.array(states))
-        actions = torch.FloatTensor(np.array(actions))
-        rewards = torch.FloatTensor(rewards).unsqueeze(1)
-        next_states = torch.FloatTensor(np.array(next_states))
-        dones = torch.FloatTensor(dones).unsqueeze(1)
+        states, actions, rewards, next_states, dones, _ = self.buffer.sample(batch_size)
+        rewards = rewards.unsqueeze(1)
+        dones = dones.unsqueeze(1)
         
-        # Calculate advantages using GAE
+        # One-step TD advantages: A_t = r_t + γV(s_{t+1})(1 - done) - V(s_t)
         with torch.no_grad():
-            values = self.value(states)
-            next_values = self.value(next_states)
+            values, next_values = self._values_pair(states, next_states)
             
-            # TD error
-            td_error = rewards + self.gamma * next_values * (1 - dones) - values
-            
-            # Simplified GAE (single-step) for demo efficiency
-            # Full GAE would accumulate: A_t = Σ(γλ)^k × δ_{t+k} over trajectory
-            # This single-step approximation is sufficient for demonstration
-            # and maintains training stability
-            advantages = td_error
-            advantages = (advantages - advantages.mean()) / (advantages.std() + 1e-8)
+            # Full GAE needs whole trajectories in order, which random
+            # sampling breaks; update() accumulates it over the rollout
+            target_values, advantages = ppo_advantages(
+                rewards, values, next_values, dones, self.gamma
+            )
+            advantages = advantages.squeeze(1)
             
             # Compute old log probabilities
             old_log_probs, _ = self.policy.evaluate_actions(states, actions)
@@ -203,57 +470,204 @@ class RLAgent:
         entropies = []
         
         for epoch in range(10):
-            # Current policy evaluation
-            log_probs, entropy = self.policy.evaluate_actions(states, actions)
-            
-            # Ratio for PPO
-            ratio = torch.exp(log_probs - old_log_probs.detach())
-            
-            # Clipped surrogate objective
-            surr1 = ratio * advantages.squeeze()
-            surr2 = torch.clamp(ratio, 1 - self.epsilon, 1 + self.epsilon) * advantages.squeeze()
-            
-            # Policy loss (negative because we want to maximize)
-            # Add entropy bonus for exploration
-            policy_loss = -torch.min(surr1, surr2).mean() - 0.01 * entropy.mean()
+            policy_loss, value_loss, entropy = self._ppo_step(
+                states, actions, old_log_probs, advantages, target_values
+            )
+            policy_losses.append(policy_loss)
+            value_losses.append(value_loss)
+            entropies.append(entropy)
+        
+        return {
+            'policy_loss': np.mean(policy_losses),
+            'value_loss': np.mean(value_losses),
+            'entropy': np.mean(entropies)
+        }
+    
+    def update(self, rollout_len: Optional[int] = None, epochs: int = 10,
+               minibatch_size: int = 64) -> dict:
+        """
+        PPO update over the latest rollout in shuffled minibatches
+        
+        GAE advantages are computed once for the whole rollout, then each epoch
+        makes one pass over it, stepping the policy and value networks on
+        every minibatch.
+        
+        Args:
+            rollout_len: Number of most recent transitions forming the
+                rollout (the whole buffer if None)
+            epochs: Passes over the rollout
+            minibatch_size: Transitions per gradient step
+        
+        Returns:
+            dict: Training metrics
+        """
+        n = len(self.buffer) if rollout_len is None else min(rollout_len, len(self.buffer))
+        if n < 2:
+            return {'policy_loss': 0, 'value_loss': 0, 'entropy': 0}
+        
+        states, actions, rewards, next_states, dones, truncated = self.buffer.latest(n)
+        cuts = torch.maximum(dones, truncated)
+        
+        with torch.no_grad():
+            values, next_values = self._values_pair(states, next_states)
+            target_values, advantages = gae_advantages(
+                rewards, values.squeeze(1), next_values.squeeze(1),
+                dones, cuts, self.gamma, self.gae_lambda
+            )
+            target_values = target_values.unsqueeze(1)
+            # Same precision as the policy passes below, so the first ratio is 1
+            with self._autocast():
+                old_log_probs, _ = self.policy.evaluate_actions(states, actions)
+            old_log_probs = old_log_probs.float()
+        
+        policy_losses = []
+        value_losses = []
+        entropies = []
+        
+        for epoch in range(epochs):
+            for idx in torch.randperm(n).split(minibatch_size):
+                policy_loss, value_loss, entropy = self._ppo_step(
+                    states[idx], actions[idx], old_log_probs[idx], advantages[idx],
+                    target_values[idx]
+                )
+                policy_losses.append(policy_loss)
+                value_losses.append(value_loss)
+                entropies.append(entropy)
+        
+        return {
+            'policy_loss': np.mean(policy_losses),
+            'value_loss': np.mean(value_losses),
+            'entropy': np.mean(entropies)
+        }
+    
+    def _ppo_step(self, states, actions, old_log_probs, advantages,
+                  target_values) -> Tuple[float, float, float]:
+        """
+        One gradient step of the policy and value networks on a batch
+        
+        Returns:
+            (policy loss, value loss, mean entropy)
+        """
+        if self.shared_trunk:
+            # One trunk pass feeds both heads; one combined backward
+            with self._autocast():
+                log_probs, entropy, predicted_values = self.policy.evaluate(states, actions)
+            entropy = entropy.float()
+            policy_loss = ppo_policy_loss(
+                log_probs.float(), old_log_probs, advantages, entropy, self.epsilon, 0.01
+            )
+            value_loss = F.mse_loss(predicted_values.float(), target_values)
             
-            # Update policy
             self.policy_optimizer.zero_grad()
-            policy_loss.backward()
+            (policy_loss + self.value_coef * value_loss).backward()
             torch.nn.utils.clip_grad_norm_(self.policy.parameters(), 0.5)
             self.policy_optimizer.step()
             
-            policy_losses.append(policy_loss.item())
-            entropies.append(entropy.mean().item())
+            return policy_loss.item(), value_loss.item(), entropy.mean().item()
         
-        # Update value function
-        for epoch in range(10):
+        # Policy step
+        with self._autocast():
+            log_probs, entropy = self.policy.evaluate_actions(states, actions)
+        log_probs, entropy = log_probs.float(), entropy.float()
+        policy_loss = ppo_policy_loss(
+            log_probs, old_log_probs, advantages, entropy, self.epsilon, 0.01
+        )
+        
+        self.policy_optimizer.zero_grad()
+        policy_loss.backward()
+        torch.nn.utils.clip_grad_norm_(self.policy.parameters(), 0.5)
+        self.policy_optimizer.step()
+        
+        # Value step
+        with self._autocast():
             predicted_values = self.value(states)
-            target_values = rewards + self.gamma * next_values.detach() * (1 - dones)
-            value_loss = nn.MSELoss()(predicted_values, target_values)
-            
-            self.value_optimizer.zero_grad()
-            value_loss.backward()
-            torch.nn.utils.clip_grad_norm_(self.value.parameters(), 0.5)
-            self.value_optimizer.step()
-            
-            value_losses.append(value_loss.item())
+        value_loss = F.mse_loss(predicted_values.float(), target_values)
         
-        return {
-            'policy_loss': np.mean(policy_losses),
-            'value_loss': np.mean(value_losses),
-            'entropy': np.mean(entropies)
-        }
+        self.value_optimizer.zero_grad()
+        value_loss.backward()
+        torch.nn.utils.clip_grad_norm_(self.value.parameters(), 0.5)
+        self.value_optimizer.step()
+        
+        return policy_loss.item(), value_loss.item(), entropy.mean().item()
+    
+    def _values_pair(self, states, next_states) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Critic values of states and next states from one batched forward
+        
+        The value targets stay fixed through every epoch of an update, so
+        this runs once per update; one pass over both halves replaces two.
+        """
+        values = self.value(torch.cat((states, next_states)))
+        return values[:len(states)], values[len(states):]
+    
+    def _autocast(self):
+        """bfloat16 autocast context, a no-op unless mixed_precision is set"""
+        return torch.autocast('cpu', dtype=torch.bfloat16, enabled=self.mixed_precision)
+    
+    def save(self, path: str):
+        """Save policy and value weights with the network dimensions"""
+        torch.save({
+            'state_dim': self.state_dim,
+            'action_dim': self.action_dim,
+            'shared_trunk': self.shared_trunk,
+            'policy': self.policy.state_dict(),
+            'value': None if self.shared_trunk else self.value.state_dict(),
+        }, path)
+    
+    @classmethod
+    def load(cls, path: str) -> 'RLAgent':
+        """Rebuild an agent from a checkpoint written by save()"""
+        checkpoint = torch.load(path, map_location='cpu')
+        agent = cls(checkpoint['state_dim'], checkpoint['action_dim'],
+                    shared_trunk=checkpoint.get('shared_trunk', False))
+        agent.policy.load_state_dict(checkpoint['policy'])
+        if checkpoint['value'] is not None:
+            agent.value.load_state_dict(checkpoint['value'])
+        return agent
     
     def set_training_mode(self, mode: bool):
         """Set training vs evaluation mode"""
         self.training_mode = mode
-        if mode:
-            self.policy.train()
-            self.value.train()
-        else:
-            self.policy.eval()
-            self.value.eval()
+        self.policy.train(mode)
+        if not self.shared_trunk:
+            self.value.train(mode)
+
+
+# GridState.values slots the rule engine reads
+_SOLAR, _WIND, _LOAD, _SOC, _STABILITY = (
+    GridState.FIELDS.index(name) for name in
+    ('solar_generation', 'wind_generation', 'load_demand', 'battery_soc', 'stability_score')
+)
+
+
+@njit(cache=True)
+def _legacy_action(s, action):
+    """LegacyGridController rules for one GridState.values array, written into action"""
+    # Calculate energy balance
+    surplus = s[_SOLAR] + s[_WIND] - s[_LOAD]
+    soc = s[_SOC]
+    
+    # Rule 1: Charge battery when there's surplus and SOC is not high
+    action[0] = min(surplus / 200.0, 1.0) if surplus > 0 and soc < 0.8 else 0.0
+    
+    # Rule 2: Discharge battery when there's deficit and SOC is not low
+    action[1] = min(-surplus / 200.0, 1.0) if surplus < 0 and soc > 0.2 else 0.0
+    
+    # Rule 3: Shift loads when stability is compromised
+    action[2] = 0.5 if s[_STABILITY] < 0.85 else 0.0
+    
+    # Rule 4: Import from grid, more for a significant deficit
+    action[3] = 0.8 if surplus < -100 else (0.3 if surplus < 0 else 0.0)
+    
+    # Rule 5: Curtail renewables only when battery is full and large surplus
+    action[4] = 0.3 if soc > 0.95 and surplus > 200 else 0.0
+
+
+@njit(cache=True, parallel=True)
+def _legacy_actions(states, actions):
+    """_legacy_action for every row of a batch state array, in parallel"""
+    for i in prange(states.shape[0]):
+        _legacy_action(states[i], actions[i])
 
 
 class LegacyGridController:
@@ -279,42 +693,23 @@ class LegacyGridController:
             action: [battery_charge, battery_discharge, load_shift, grid_import, curtailment]
         """
         action = np.zeros(5)
+        _legacy_action(state.values, action)
+        return action
+    
+    def get_action_batch(self, states: np.ndarray) -> np.ndarray:
+        """
+        Rule-based actions for many environments in one parallel kernel call
         
-        # Calculate energy balance
-        renewable = state.solar_generation + state.wind_generation
-        load = state.load_demand
-        surplus = renewable - load
-        
-        # Rule 1: Battery charging
-        if surplus > 0 and state.battery_soc < 0.8:
-            # Charge battery when there's surplus and SOC is not high
-            charge_intensity = min(surplus / 200.0, 1.0)
-            action[0] = charge_intensity
-        
-        # Rule 2: Battery discharging
-        if surplus < 0 and state.battery_soc > 0.2:
-            # Discharge battery when there's deficit and SOC is not low
-            discharge_intensity = min(abs(surplus) / 200.0, 1.0)
-            action[1] = discharge_intensity
-        
-        # Rule 3: Load shifting
-        if state.stability_score < 0.85:
-            # Shift loads when stability is compromised
-            action[2] = 0.5
-        
-        # Rule 4: Grid import
-        if surplus < -100:
-            # Import from grid when significant deficit
-            action[3] = 0.8
-        elif surplus < 0:
-            action[3] = 0.3
-        
-        # Rule 5: Curtailment
-        if state.battery_soc > 0.95 and surplus > 200:
-            # Curtail renewables only when battery is full and large surplus
-            action[4] = 0.3
+        Args:
+            states: (N, len(GridState.FIELDS)) GridState.values rows, e.g.
+                MicrogridBatch.states
         
-        return action
+        Returns:
+            actions: (N, 5) array, as get_action for each row
+        """
+        actions = np.zeros((states.shape[0], 5))
+        _legacy_actions(states, actions)
+        return actions
 
 
 class DQNAgent:
@@ -323,9 +718,22 @@ class DQNAgent:
     Uses Q-learning for discrete action spaces
     """
     
-    def __init__(self, state_dim: int, action_dim: int, lr: float = 1e-3):
+    def __init__(self, state_dim: int, action_dim: int, lr: float = 1e-3,
+                 quantize_target: bool = False):
+        """
+        Args:
+            state_dim: State vector size
+            action_dim: Number of discrete actions
+            lr: Adam learning rate
+            quantize_target: Compute bootstrap targets with an int8
+                dynamically quantized copy of the target network, rebuilt
+                on every update_target_network(). Only worth it for large
+                batches; at the default batch of 64 the 128-wide int8
+                layers are slower than float32 on CPU.
+        """
         self.state_dim = state_dim
         self.action_dim = action_dim
+        self.quantize_target = quantize_target
         
         # Q-networks
         self.q_network = nn.Sequential(
@@ -344,11 +752,12 @@ class DQNAgent:
             nn.Linear(128, action_dim)
         )
         
-        # Copy weights
-        self.target_network.load_state_dict(self.q_network.state_dict())
+        # Copy weights; target_network stays float32 so it can keep
+        # receiving them, _target_forward is what computes the targets
+        self.update_target_network()
         
         # Optimizer
-        self.optimizer = optim.Adam(self.q_network.parameters(), lr=lr)
+        self.optimizer = _adam(self.q_network.parameters(), lr)
         
         # Hyperparameters
         self.gamma = 0.99
@@ -357,44 +766,43 @@ class DQNAgent:
         self.epsilon_min = 0.01
         
         # Replay buffer
-        self.buffer = deque(maxlen=10000)
+        self.buffer = ReplayBuffer(10000, state_dim)
     
     def select_action(self, state: np.ndarray, deterministic: bool = False) -> int:
         """Select action using epsilon-greedy policy"""
         if not deterministic and random.random() < self.epsilon:
             return random.randint(0, self.action_dim - 1)
         
-        with torch.no_grad():
-            state_tensor = torch.FloatTensor(state).unsqueeze(0)
+        with torch.inference_mode():
+            state_tensor = torch.as_tensor(state, dtype=torch.float32).unsqueeze(0)
             q_values = self.q_network(state_tensor)
             return q_values.argmax().item()
     
+    def store_transition(self, state, action, reward, next_state, done):
+        """Store experience in replay buffer (a (K, state_dim) batch is written row-wise)"""
+        if np.ndim(state) == 2:
+            self.buffer.extend(state, action, reward, next_state, done)
+        else:
+            self.buffer.append(state, action, reward, next_state, done)
+    
     def train_step(self, batch_size: int = 64):
         """Perform one DQN training step"""
         if len(self.buffer) < batch_size:
             return 0
         
         # Sample batch
-        batch = random.sample(self.buffer, batch_size)
-        states, actions, rewards, next_states, dones = zip(*batch)
+        states, actions, rewards, next_states, dones, _ = self.buffer.sample(batch_size)
         
-        # Convert to tensors
-        states = torch.FloatTensor(np.array(states))
-        actions = torch.LongTensor(actions)
-        rewards = torch.FloatTensor(rewards)
-        next_states = torch.FloatTensor(np.array(next_states))
-        dones = torch.FloatTensor(dones)
+        # Current Q-values (squeeze(1) keeps a batch of one 1-D)
+        current_q = self.q_network(states).gather(1, actions.unsqueeze(1)).squeeze(1)
         
-        # Current Q-values
-        current_q = self.q_network(states).gather(1, actions.unsqueeze(1))
-        
-        # Target Q-values
+        # Target Q-values: rewards + gamma * max_a Q'(s', a) * (1 - done)
         with torch.no_grad():
-            next_q = self.target_network(next_states).max(1)[0]
-            target_q = rewards + self.gamma * next_q * (1 - dones)
+            next_q = self._target_forward(next_states).amax(1)
+            target_q = torch.addcmul(rewards, next_q, 1 - dones, value=self.gamma)
         
         # Loss
-        loss = nn.MSELoss()(current_q.squeeze(), target_q)
+        loss = F.mse_loss(current_q, target_q)
         
         # Update
         self.optimizer.zero_grad()
@@ -408,7 +816,17 @@ class DQNAgent:
     
     def update_target_network(self):
         """Update target network weights"""
-        self.target_network.load_state_dict(self.q_network.state_dict())
+        with torch.no_grad():
+            torch._foreach_copy_(list(self.target_network.parameters()),
+                                 list(self.q_network.parameters()))
+        
+        self._target_forward = self.target_network
+        if self.quantize_target:
+            with warnings.catch_warnings():
+                # torch.ao.quantization is deprecated in favour of torchao
+                warnings.simplefilter('ignore')
+                self._target_forward = torch.ao.quantization.quantize_dynamic(
+                    self.target_network, {nn.Linear}, dtype=torch.qint8)
 
 
 class SACAgent:
@@ -436,10 +854,18 @@ class SACAgent:
         self.target_q1.load_state_dict(self.q1.state_dict())
         self.target_q2.load_state_dict(self.q2.state_dict())
         
+        # Flat parameter buffers of the critics, keyed by module, so a soft
+        # update is one lerp over each network (load_state_dict copies in
+        # place and keeps them valid)
+        self._flat_params = {
+            net: _flatten_parameters(net)
+            for net in (self.q1, self.q2, self.target_q1, self.target_q2)
+        }
+        
         # Optimizers
-        self.actor_optimizer = optim.Adam(self.actor.parameters(), lr=lr)
-        self.q1_optimizer = optim.Adam(self.q1.parameters(), lr=lr)
-        self.q2_optimizer = optim.Adam(self.q2.parameters(), lr=lr)
+        self.actor_optimizer = _adam(self.actor.parameters(), lr)
+        self.q1_optimizer = _adam(self.q1.parameters(), lr)
+        self.q2_optimizer = _adam(self.q2.parameters(), lr)
         
         # Hyperparameters
         self.gamma = 0.99
@@ -447,13 +873,14 @@ class SACAgent:
         self.alpha = 0.2  # Temperature parameter
         
         # Replay buffer
-        self.buffer = deque(maxlen=10000)
+        self.buffer = ReplayBuffer(10000, state_dim, action_dim)
     
     def select_action(self, state: np.ndarray, deterministic: bool = False) -> np.ndarray:
         """Select action from actor network"""
-        with torch.no_grad():
-            state_tensor = torch.FloatTensor(state).unsqueeze(0)
-            action = self.actor(state_tensor).numpy()[0]
+        with torch.inference_mode():
+            state_tensor = torch.as_tensor(state, dtype=torch.float32).unsqueeze(0)
+            mean, _ = self.actor(state_tensor)
+            action = mean.numpy()[0]
         
         if not deterministic:
             # Add Gaussian noise
@@ -462,9 +889,21 @@ class SACAgent:
         
         return action
     
+    def store_transition(self, state, action, reward, next_state, done):
+        """Store experience in replay buffer (a (K, state_dim) batch is written row-wise)"""
+        if np.ndim(state) == 2:
+            self.buffer.extend(state, action, reward, next_state, done)
+        else:
+            self.buffer.append(state, action, reward, next_state, done)
+    
     def soft_update(self, target, source):
-        """Soft update of target network"""
-        for target_param, param in zip(target.parameters(), source.parameters()):
-            target_param.data.copy_(
-                target_param.data * (1.0 - self.tau) + param.data * self.tau
-            )
+        """Soft update of target network: target += tau * (source - target)"""
+        with torch.no_grad():
+            if target in self._flat_params and source in self._flat_params:
+                self._flat_params[target].lerp_(self._flat_params[source], self.tau)
+                return
+            
+            # Other modules: two multi-tensor ops over all parameters
+            target_params = list(target.parameters())
+            torch._foreach_mul_(target_params, 1.0 - self.tau)
+            torch._foreach_add_(target_params, list(source.parameters()), alpha=self.tau)
@@ -0,0 +1,128 @@
+"""
+Simulation Worker - Background Stepping Thread
+Advances the digital twin independently of the Streamlit render loop
+"""
+
+import threading
+import numpy as np
+from typing import Optional
+
+# Idle command for the untrained AI in comparison mode (read-only, shared)
+ZERO_ACTION = np.zeros(5, dtype=np.float32)
+ZERO_ACTION.setflags(write=False)
+
+
+class SimulationWorker:
+    """
+    Steps the grid simulators on a daemon thread at a fixed cadence
+
+    The worker never touches Streamlit state. The app hands it a plain
+    `controls` dict (simulators, controllers, forecaster, history and the
+    sidebar settings) and refreshes it on every script run; the worker
+    reads it once per tick. Steps are written straight into the
+    preallocated GridHistory columns, so the dashboard only has to read
+    the latest write index when it redraws.
+    """
+
+    def __init__(self, controls: dict):
+        self.controls = controls
+        self.current_step = 0
+        self.error: Optional[BaseException] = None
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def limit_reached(self) -> bool:
+        return self.current_step >= self.controls['max_steps']
+
+    def start(self):
+        """Start stepping in the background (no-op if running, finished or failed)"""
+        if self.is_running or self.limit_reached or self.error is not None:
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """Stop stepping and wait for the in-flight step to finish"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def reset(self):
+        """Stop the thread and rewind the step counter"""
+        self.stop()
+        self.current_step = 0
+        self.error = None
+
+    def _run(self):
+        """Thread body: step, then wait out the rest of the tick"""
+        try:
+            while not self._stop_event.is_set() and not self.limit_reached:
+                self.step()
+                if self.limit_reached:
+                    break
+                self._stop_event.wait(1.0 / self.controls['sim_speed'])
+        except Exception as e:
+            self.error = e
+
+    def step(self):
+        """Advance the active simulator(s) by one step and log the result"""
+        c = self.controls
+        simulator = c['simulator']
+        forecaster = c['forecaster']
+        history = c['history']
+
+        # Update forecaster with current observations
+        state = simulator.state
+        forecaster.update_history(
+            state.time_of_day,
+            state.solar_generation,
+            state.wind_generation,
+            state.load_demand,
+            state.cloud_cover,
+            state.wind_speed,
+            state.temperature
+        )
+
+        # Predictive mode appends the forecast to the state vector
+        if c['use_forecasting'] and forecaster.has_forecast:
+            forecast_solar, forecast_wind, forecast_load = forecaster.predict()
+            state_vec = simulator.get_state_vector(
+                forecast_solar, forecast_wind, forecast_load
+            )
+        else:
+            state_vec = simulator.get_state_vector()
+
+        if c['comparison_mode']:
+            # AI simulator vs a separate rule-based instance (no forecast)
+            if c['training_complete']:
+                action_ai = c['rl_agent'].select_action(state_vec)
+            else:
+                action_ai = ZERO_ACTION
+            _, reward_ai, _ = simulator.step(action_ai)
+
+            legacy = c['simulator_legacy']
+            action_rule = c['legacy_controller'].get_action(legacy.state)
+            _, reward_rule, _ = legacy.step(action_rule)
+
+            history['ai'].append(self.current_step, simulator.state, action_ai, reward_ai)
+            history['rule'].append(self.current_step, legacy.state, action_rule, reward_rule)
+        else:
+            if c['ai_enabled'] and c['training_complete']:
+                action = c['rl_agent'].select_action(state_vec)
+            else:
+                action = c['legacy_controller'].get_action(simulator.state)
+            _, reward, _ = simulator.step(action)
+
+            mode = 'ai' if c['ai_enabled'] else 'rule'
+            history[mode].append(self.current_step, simulator.state, action, reward)
+
+        self.current_step += 1
@@ -0,0 +1,80 @@
+"""
+Statistics Kernels - Fused Numba Reductions
+Single-pass summaries over GridHistory columns
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, fastmath=True)
+def fused_behaviour_summary(solar, wind, load, battery_soc, energy_cost,
+                            cloud_cover, actions, n):
+    """
+    Summarize the agent's learned behaviour in one pass over the history
+
+    Replaces a dozen NumPy reductions (each allocating a boolean mask or
+    temporary) with a single loop over the contiguous columns.
+
+    Args:
+        solar, wind, load, battery_soc, energy_cost, cloud_cover:
+            Chronological 1D history columns
+        actions: Chronological (n, 5) action array
+        n: Number of logged steps
+
+    Returns:
+        Tuple of (charge_on_surplus, discharge_on_deficit, low_soc_count,
+        high_import_count, battery_first_frac, avg_cost, pre_cloud_charge).
+        Conditional means are NaN when their condition never occurred.
+        Peak-load and high-stability counts are kept by GridHistory.
+    """
+    surplus_charge = 0.0
+    surplus_count = 0
+    deficit_discharge = 0.0
+    deficit_count = 0
+    low_soc = 0
+    high_import = 0
+    battery_first = 0
+    cost_sum = 0.0
+    cloud_charge = 0.0
+    cloud_count = 0
+
+    # Sum of the charge command over the previous 5 steps
+    lookback = 0.0
+
+    for i in range(n):
+        renewable = solar[i] + wind[i]
+
+        if renewable > load[i]:
+            surplus_charge += actions[i, 0]
+            surplus_count += 1
+        elif load[i] > renewable:
+            deficit_discharge += actions[i, 1]
+            deficit_count += 1
+
+        if battery_soc[i] < 0.2:
+            low_soc += 1
+        if actions[i, 3] > 0.7:
+            high_import += 1
+        if actions[i, 1] > actions[i, 3]:
+            battery_first += 1
+        cost_sum += energy_cost[i]
+
+        # Pre-charging ahead of heavy cloud cover
+        if i > 5 and cloud_cover[i] > 0.7:
+            cloud_charge += lookback / 5.0
+            cloud_count += 1
+
+        lookback += actions[i, 0]
+        if i >= 5:
+            lookback -= actions[i - 5, 0]
+
+    return (
+        surplus_charge / surplus_count if surplus_count > 0 else np.nan,
+        deficit_discharge / deficit_count if deficit_count > 0 else np.nan,
+        low_soc,
+        high_import,
+        battery_first / max(n, 1),
+        cost_sum / max(n, 1),
+        cloud_charge / cloud_count if cloud_count > 0 else np.nan,
+    )
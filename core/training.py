@@ -0,0 +1,244 @@
+"""
+Agent Training - Quick PPO Training Loop
+Trains an RLAgent on fresh digital-twin episodes with forecast-augmented states
+"""
+
+import random
+import multiprocessing
+import numpy as np
+import torch
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from .grid_simulator import MicrogridDigitalTwin, MicrogridBatch
+from .rl_agent import RLAgent, PolicyNetwork
+from .forecaster import ShortTermForecaster, LSTMForecaster
+
+
+def _forecast(forecaster: ShortTermForecaster) -> Optional[Tuple[float, float, float]]:
+    """One-step forecast once the forecaster has enough history, else None"""
+    if forecaster.has_forecast:
+        return forecaster.predict()
+    return None
+
+
+def _observe(sim: MicrogridDigitalTwin, forecast: Optional[Tuple[float, float, float]]) -> np.ndarray:
+    """State vector, with the forecast appended when there is one"""
+    if forecast is not None:
+        return sim.get_state_vector(*forecast)
+    return sim.get_state_vector()
+
+
+def _collect_episode(policy_state: dict, forecast_state: Optional[dict], state_dim: int,
+                     action_dim: int, steps: int, seed: int) -> List[Tuple]:
+    """
+    Actor process body: roll out one episode with a frozen policy copy
+
+    Returns:
+        List of (state, action, reward, next_state, done) transitions
+    """
+    torch.set_num_threads(1)  # one core per actor
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+
+    policy = PolicyNetwork(state_dim, action_dim)
+    policy.load_state_dict(policy_state)
+    policy.eval()
+
+    forecast_model = None
+    if forecast_state is not None:
+        forecast_model = LSTMForecaster(ShortTermForecaster.INPUT_DIM)
+        forecast_model.load_state_dict(forecast_state)
+        forecast_model.eval()
+
+    sim = MicrogridDigitalTwin()
+    forecaster = ShortTermForecaster(model=forecast_model)
+    transitions = []
+
+    for step in range(steps):
+        forecaster.update_history(
+            sim.state.time_of_day,
+            sim.state.solar_generation,
+            sim.state.wind_generation,
+            sim.state.load_demand,
+            sim.state.cloud_cover,
+            sim.state.wind_speed,
+            sim.state.temperature
+        )
+        # One forecast per step serves both the state and next-state encodings
+        forecast = _forecast(forecaster)
+        state = _observe(sim, forecast)
+
+        with torch.inference_mode():
+            state_tensor = torch.as_tensor(state, dtype=torch.float32).unsqueeze(0)
+            action = policy.sample_action(state_tensor).numpy()[0]
+        action = np.clip(action, 0, 1)
+
+        _, reward, done = sim.step(action)
+        transitions.append((state, action, reward, _observe(sim, forecast), done))
+
+        if done:
+            break
+
+    return transitions
+
+
+def _train_parallel(agent: RLAgent, episodes: int, steps: int, seed: int, workers: int,
+                    forecast_model: Optional[LSTMForecaster],
+                    progress_callback: Optional[Callable[[float], None]]):
+    """
+    Actor/learner loop: roll out `workers` episodes at a time, then update
+
+    Each wave broadcasts the current policy weights to the actor processes,
+    merges their transitions into the agent's buffer, and runs one PPO
+    update over the merged rollout on the main process.
+    """
+    forecast_state = forecast_model.state_dict() if forecast_model is not None else None
+
+    # spawn: forked children inherit torch/Streamlit threads and can deadlock
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        done_episodes = 0
+        while done_episodes < episodes:
+            wave = min(workers, episodes - done_episodes)
+            policy_state = {k: v.detach().clone() for k, v in agent.policy.state_dict().items()}
+
+            futures = [
+                pool.submit(_collect_episode, policy_state, forecast_state,
+                            agent.state_dim, agent.action_dim, steps,
+                            seed + done_episodes + m)
+                for m in range(wave)
+            ]
+            collected = 0
+            for future in futures:
+                # One batched store per episode; episodes are merged into
+                # one rollout, so mark where each ends
+                states, actions, rewards, next_states, dones = map(np.array, zip(*future.result()))
+                truncated = np.zeros(len(rewards))
+                truncated[-1] = 1.0
+                agent.store_transition(states, actions, rewards, next_states, dones, truncated)
+                collected += len(rewards)
+
+            agent.update(rollout_len=collected)
+
+            done_episodes += wave
+            if progress_callback is not None:
+                progress_callback(done_episodes / episodes)
+
+
+def train_agent(state_dim: int = 13, action_dim: int = 5, episodes: int = 50,
+                steps: int = 100, seed: int = 0,
+                forecast_model: Optional[LSTMForecaster] = None,
+                progress_callback: Optional[Callable[[float], None]] = None,
+                workers: int = 1) -> RLAgent:
+    """
+    Train a fresh PPO agent for the dashboard's quick-training mode
+
+    Args:
+        state_dim: State vector size (13 with forecasts)
+        action_dim: Action vector size
+        episodes: Number of simulated episodes
+        steps: Maximum steps per episode
+        seed: Seed for the Python, NumPy and PyTorch RNGs
+        forecast_model: LSTM shared by the per-episode forecasters
+        progress_callback: Called with the completed fraction after each episode
+        workers: Actor processes rolling out episodes in parallel (opt-in;
+            the dashboard trains serially). With more than one, the learner
+            updates once per wave of `workers` episodes instead of after
+            every episode, so the result depends on `workers`. Each call
+            starts a fresh spawn pool, so this only pays off for long runs
+            on hosts with spare cores.
+
+    Returns:
+        The trained agent
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+
+    agent = RLAgent(state_dim=state_dim, action_dim=action_dim)
+
+    if workers > 1:
+        _train_parallel(agent, episodes, steps, seed, workers, forecast_model, progress_callback)
+        return agent
+
+    for episode in range(episodes):
+        sim = MicrogridDigitalTwin()
+        forecaster = ShortTermForecaster(model=forecast_model)
+
+        state = sim.get_state_vector()
+        rollout_len = 0
+
+        for step in range(steps):
+            # Update forecaster
+            forecaster.update_history(
+                sim.state.time_of_day,
+                sim.state.solar_generation,
+                sim.state.wind_generation,
+                sim.state.load_demand,
+                sim.state.cloud_cover,
+                sim.state.wind_speed,
+                sim.state.temperature
+            )
+
+            # One forecast per step serves both the state and next-state encodings
+            forecast = _forecast(forecaster)
+            state = _observe(sim, forecast)
+            action = agent.select_action(state)
+            next_state, reward, done = sim.step(action)
+            next_state_vec = _observe(sim, forecast)
+
+            agent.store_transition(state, action, reward, next_state_vec, done)
+            rollout_len += 1
+
+            state = next_state_vec
+
+            if done:
+                break
+
+        # PPO update on the finished episode
+        agent.update(rollout_len=rollout_len)
+
+        if progress_callback is not None:
+            progress_callback((episode + 1) / episodes)
+
+    return agent
+
+
+def evaluate_policy_batch(policy: Callable[[np.ndarray], np.ndarray], n_envs: int = 1024,
+                          horizon: int = 1000, seed: Optional[int] = None) -> np.ndarray:
+    """
+    Monte-Carlo policy evaluation over a batch of parallel environments
+
+    All environments advance together through MicrogridBatch, so each step
+    is one policy call on an (n_envs, 13) array plus one parallel kernel
+    call, instead of n_envs sequential episodes.
+
+    Args:
+        policy: Maps (n_envs, 13) reactive-mode state vectors to (n_envs, 5)
+            actions, e.g. a deterministic PPO policy:
+            lambda s: agent.select_action(s, deterministic=True)
+        n_envs: Number of episodes evaluated in parallel
+        horizon: Maximum steps per episode
+        seed: Seed for the NumPy and Python RNGs the simulator draws from
+
+    Returns:
+        (n_envs,) total reward of each episode, up to and including its
+        terminating step
+    """
+    batch = MicrogridBatch(n_envs, seed)
+    states = batch.get_state_vectors()
+    returns = np.zeros(n_envs)
+    running = np.ones(n_envs, dtype=np.bool_)
+
+    for _ in range(horizon):
+        states, rewards, dones = batch.step(policy(states))
+
+        # Finished environments keep stepping but no longer score
+        returns += np.where(running, rewards, 0.0)
+        running &= ~dones
+        if not running.any():
+            break
+
+    return returns
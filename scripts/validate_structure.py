@@ -16,9 +16,19 @@ class Colors:
     BOLD = '\033[1m'
     END = '\033[0m'
 
-def check_file_exists(filepath, required=True):
-    """Check if a file exists"""
-    exists = Path(filepath).exists()
+def list_files(root='.'):
+    """Relative POSIX paths of every file under root from one walk, skipping __pycache__"""
+    present = set()
+    for dirpath, dirs, files in os.walk(root):
+        # Prune cache directories instead of filtering every file inside them
+        dirs[:] = [d for d in dirs if d != '__pycache__']
+        prefix = Path(os.path.relpath(dirpath, root))
+        present.update((prefix / name).as_posix() for name in files)
+    return present
+
+def check_file_exists(filepath, present, required=True):
+    """Check if a file is in the set of present files"""
+    exists = filepath in present
     status = f"{Colors.GREEN}✓{Colors.END}" if exists else f"{Colors.RED}✗{Colors.END}"
     req = "(required)" if required else "(optional)"
     
@@ -40,6 +50,9 @@ def validate_structure():
     
     all_passed = True
     
+    # One directory walk serves every existence check and the file counts
+    present = list_files()
+    
     # Root level files
     print(f"{Colors.BLUE}[1/5] Root Level Files{Colors.END}")
     root_files = [
@@ -55,7 +68,7 @@ def validate_structure():
     ]
     
     for filepath, required in root_files:
-        if not check_file_exists(filepath, required):
+        if not check_file_exists(filepath, present, required):
             all_passed = False
     print()
     
@@ -69,7 +82,7 @@ def validate_structure():
     ]
     
     for filepath, required in core_files:
-        if not check_file_exists(filepath, required):
+        if not check_file_exists(filepath, present, required):
             all_passed = False
     print()
     
@@ -80,7 +93,7 @@ def validate_structure():
     ]
     
     for filepath, required in script_files:
-        if not check_file_exists(filepath, required):
+        if not check_file_exists(filepath, present, required):
             all_passed = False
     print()
     
@@ -100,7 +113,7 @@ def validate_structure():
     ]
     
     for filepath, required in doc_files:
-        if not check_file_exists(filepath, required):
+        if not check_file_exists(filepath, present, required):
             all_passed = False
     print()
     
@@ -134,9 +147,9 @@ def validate_structure():
     
     # File count summary
     print(f"{Colors.BLUE}File Count Summary:{Colors.END}")
-    total_files = sum(1 for _ in Path('.').rglob('*') if _.is_file() and '__pycache__' not in str(_))
-    py_files = sum(1 for _ in Path('.').rglob('*.py') if '__pycache__' not in str(_))
-    md_files = sum(1 for _ in Path('.').rglob('*.md'))
+    total_files = len(present)
+    py_files = sum(1 for name in present if name.endswith('.py'))
+    md_files = sum(1 for name in present if name.endswith('.md'))
     
     print(f"  Total files: {total_files}")
     print(f"  Python files: {py_files}")
@@ -6,6 +6,8 @@ Checks for common runtime issues before demo
 
 import re
 import sys
+from collections import Counter
+from functools import lru_cache
 from pathlib import Path
 
 class Colors:
@@ -15,66 +17,88 @@ class Colors:
     BLUE = '\033[94m'
     END = '\033[0m'
 
+# Every token the checks look for, as one alternation so a file is scanned once
+_TOKENS = re.compile(
+    r'(?P<rerun>st\.rerun\(\))'
+    r'|(?P<todo>(?i:todo|fixme))'
+    r'|(?P<simulator_rule>simulator_rule)'
+    r'|(?P<rule_controller>rule_controller)'
+    r'|(?P<legacy_controller>legacy_controller)'
+    r'|(?P<grid_simulator>GridSimulator)'
+    r'|(?P<digital_twin>MicrogridDigitalTwin)'
+    r'|(?P<import_numpy>import numpy)'
+    r'|(?P<import_pandas>import pandas)'
+    r'|(?P<import_torch>import torch)'
+    r'|(?P<np>np\.)'
+    r'|(?P<pd>pd\.)'
+    r'|(?P<torch>torch\.)'
+)
+
+@lru_cache(maxsize=None)
+def read_file(filepath):
+    """File contents, read once per run"""
+    with open(filepath, 'r') as f:
+        return f.read()
+
+@lru_cache(maxsize=None)
+def scan(filepath):
+    """Occurrences of each _TOKENS group in a file, from a single regex pass"""
+    return Counter(m.lastgroup for m in _TOKENS.finditer(read_file(filepath)))
+
 def check_file_exists(filepath):
     """Check if file exists"""
     return Path(filepath).exists()
 
 def check_st_rerun_safety(filepath):
     """Check for potential infinite rerun loops"""
-    with open(filepath, 'r') as f:
-        content = f.read()
-    
-    # Find all st.rerun() calls
-    rerun_pattern = r'st\.rerun\(\)'
-    reruns = re.findall(rerun_pattern, content)
+    rerun_count = scan(filepath)['rerun']
     
     # Check for safety guards before st.rerun()
     issues = []
-    lines = content.split('\n')
-    for i, line in enumerate(lines):
-        if 'st.rerun()' in line:
-            # Look back 20 lines for safety checks
-            context = '\n'.join(lines[max(0, i-20):i])
-            has_guard = any([
-                'if st.session_state' in context,
-                'max_steps' in context,
-                'simulation_running' in context
-            ])
-            if not has_guard:
-                issues.append(f"Line {i+1}: st.rerun() may lack safety guard")
-    
-    return len(reruns), issues
+    if rerun_count:
+        lines = read_file(filepath).split('\n')
+        for i, line in enumerate(lines):
+            if 'st.rerun()' in line:
+                # Look back 20 lines for safety checks
+                context = '\n'.join(lines[max(0, i-20):i])
+                has_guard = any([
+                    'if st.session_state' in context,
+                    'max_steps' in context,
+                    'simulation_running' in context
+                ])
+                if not has_guard:
+                    issues.append(f"Line {i+1}: st.rerun() may lack safety guard")
+    
+    return rerun_count, issues
 
 def check_naming_consistency(filepath):
     """Check for old naming conventions"""
-    with open(filepath, 'r') as f:
-        content = f.read()
+    found = scan(filepath)
     
     issues = []
     
     # Check for old names
-    if 'simulator_rule' in content:
+    if found['simulator_rule']:
         issues.append("Found 'simulator_rule' - should be 'simulator_legacy'")
-    if 'rule_controller' in content and 'legacy_controller' not in content:
+    if found['rule_controller'] and not found['legacy_controller']:
         issues.append("Found 'rule_controller' without 'legacy_controller'")
-    if 'GridSimulator' in content and 'MicrogridDigitalTwin' not in content:
+    if found['grid_simulator'] and not found['digital_twin']:
         issues.append("Found 'GridSimulator' - should be 'MicrogridDigitalTwin'")
     
     return issues
 
 def check_imports(filepath):
     """Check for missing imports"""
-    with open(filepath, 'r') as f:
-        content = f.read()
+    found = scan(filepath)
     
     issues = []
     
     # Check for common usage without imports
-    if 'np.' in content and 'import numpy' not in content:
+    if found['np'] and not found['import_numpy']:
         issues.append("Uses numpy (np.) but may not import it")
-    if 'pd.' in content and 'import pandas' not in content:
+    if found['pd'] and not found['import_pandas']:
         issues.append("Uses pandas (pd.) but may not import it")
-    if 'torch.' in content and 'import torch' not in content:
+    if found['torch'] and not found['import_torch']:
         issues.append("Uses torch but may not import it")
     
     return issues
@@ -150,12 +174,10 @@ def verify_app():
     todo_count = 0
     for filename, _ in files_to_check[:4]:
         if check_file_exists(filename):
-            with open(filename, 'r') as f:
-                content = f.read()
-                todos = len(re.findall(r'TODO|FIXME', content, re.IGNORECASE))
-                if todos > 0:
-                    print(f"  {Colors.YELLOW}⚠ {filename}: {todos} TODO/FIXME comments{Colors.END}")
-                    todo_count += todos
+            todos = scan(filename)['todo']
+            if todos > 0:
+                print(f"  {Colors.YELLOW}⚠ {filename}: {todos} TODO/FIXME comments{Colors.END}")
+                todo_count += todos
     
     if todo_count == 0:
         print(f"  {Colors.GREEN}✓ No TODO/FIXME comments found{Colors.END}")